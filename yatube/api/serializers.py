@@ -0,0 +1,107 @@
+class Serializer:
+    """
+    Преобразует объект модели в словарь для JSON.
+
+    ``fields`` сопоставляет имени поля функцию ``(объект, запрос)``,
+    ``related`` — путь ``select_related``, который нужен полю. Связанные
+    объекты подгружаются одним JOIN и только для запрошенных полей.
+    """
+
+    fields = {}
+    related = {}
+
+    def __init__(self, request, names=None):
+        if names is None:
+            names = tuple(self.fields)
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ValueError(
+                'Неизвестные поля: {}.'.format(', '.join(unknown))
+            )
+        self.request = request
+        self.names = tuple(names)
+
+    @classmethod
+    def from_request(cls, request):
+        """Сериализатор с полями из параметра ``?fields=a,b``."""
+        raw = request.GET.get('fields')
+        if not raw:
+            return cls(request)
+        names = dict.fromkeys(
+            name.strip() for name in raw.split(',') if name.strip()
+        )
+        return cls(request, tuple(names))
+
+    def prepare(self, queryset, prefix=''):
+        related = {
+            prefix + self.related[name]
+            for name in self.names if name in self.related
+        }
+        if related:
+            return queryset.select_related(*sorted(related))
+        return queryset
+
+    def to_dict(self, obj):
+        return {
+            name: self.fields[name](obj, self.request) for name in self.names
+        }
+
+
+def _image_url(post, request):
+    if not post.image:
+        return None
+    return request.build_absolute_uri(post.image.url)
+
+
+class PostSerializer(Serializer):
+    fields = {
+        'id': lambda post, request: post.pk,
+        'text': lambda post, request: post.text,
+        'pub_date': lambda post, request: post.pub_date,
+        'updated': lambda post, request: post.updated,
+        'author': lambda post, request: post.author.username,
+        'group': lambda post, request: post.group and post.group.slug,
+        'image': _image_url,
+    }
+    related = {
+        'author': 'author',
+        'group': 'group',
+    }
+
+
+class GroupSerializer(Serializer):
+    fields = {
+        'id': lambda group, request: group.pk,
+        'title': lambda group, request: group.title,
+        'slug': lambda group, request: group.slug,
+        'description': lambda group, request: group.description,
+    }
+
+
+class CommentSerializer(Serializer):
+    fields = {
+        'id': lambda comment, request: comment.pk,
+        'post': lambda comment, request: comment.post_id,
+        'author': lambda comment, request: comment.author.username,
+        'text': lambda comment, request: comment.text,
+        'created': lambda comment, request: comment.created,
+    }
+    related = {
+        'author': 'author',
+    }
+
+
+class ProfileSerializer(Serializer):
+    fields = {
+        'username': lambda user, request: user.username,
+        'first_name': lambda user, request: user.first_name,
+        'last_name': lambda user, request: user.last_name,
+        'post_count': lambda user, request: user.stats.post_count,
+        'follower_count': lambda user, request: user.stats.follower_count,
+        'following_count': lambda user, request: user.stats.following_count,
+    }
+    related = {
+        'post_count': 'stats',
+        'follower_count': 'stats',
+        'following_count': 'stats',
+    }
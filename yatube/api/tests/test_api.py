@@ -0,0 +1,183 @@
+import base64
+import json
+
+from core.testing import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+POSTS_COUNT = 7
+
+
+class ApiTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        for number in range(POSTS_COUNT):
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.latest('pk')
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get_json(self, url, client=None, **params):
+        response = (client or self.guest_client).get(url, params)
+        if response.streaming:
+            content = b''.join(response.streaming_content)
+        else:
+            content = response.content
+        return response, json.loads(content)
+
+    def test_api_post_list_cursor_pagination(self):
+        """Проверка обхода списка постов по курсорам."""
+        url = reverse('api:post_list')
+        response, data = self.get_json(url, limit=3)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIsNone(data['previous'])
+        seen = [post['id'] for post in data['results']]
+        while data['next']:
+            response, data = self.get_json(data['next'])
+            seen.extend(post['id'] for post in data['results'])
+        self.assertEqual(
+            seen,
+            list(Post.objects.order_by('-pub_date', '-pk')
+                 .values_list('pk', flat=True)),
+        )
+
+    def test_api_post_list_previous_page(self):
+        """Проверка возврата на предыдущую страницу по курсору before."""
+        url = reverse('api:post_list')
+        _, first = self.get_json(url, limit=2)
+        _, second = self.get_json(first['next'])
+        _, third = self.get_json(second['next'])
+        _, data = self.get_json(third['previous'])
+        self.assertEqual(data['results'], second['results'])
+        self.assertEqual(data['next'], second['next'])
+        _, data = self.get_json(second['previous'])
+        self.assertEqual(data['results'], first['results'])
+        self.assertIsNone(data['previous'])
+
+    def test_api_post_list_rows_streamed(self):
+        """Проверка, что строки страницы читаются уже при отдаче ответа."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(reverse('api:post_list'))
+        self.assertFalse(any(
+            'FROM "posts_post"' in query['sql']
+            for query in queries.captured_queries
+        ))
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(data['results']), POSTS_COUNT)
+
+    def test_api_malformed_cursor(self):
+        """Проверка, что курсор с чужими типами значений не даёт 500."""
+        url = reverse('api:post_list')
+        _, first = self.get_json(url)
+        for values in ([None, None], [1.5, 2], [[1], [2]]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()
+            ).decode()
+            for name in ('after', 'before'):
+                with self.subTest(values=values, name=name):
+                    response, data = self.get_json(url, **{name: cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(data['results'], first['results'])
+
+    def test_api_sparse_fieldsets(self):
+        """Проверка выбора полей через ?fields=."""
+        _, data = self.get_json(
+            reverse('api:post_list'), fields='id,author'
+        )
+        self.assertEqual(set(data['results'][0]), {'id', 'author'})
+        self.assertEqual(data['results'][0]['author'], 'author')
+        response, data = self.get_json(
+            reverse('api:post_list'), fields='id,password'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', data['detail'])
+
+    def test_api_related_loaded_in_bulk(self):
+        """Проверка, что авторы и группы не грузятся по одному."""
+        response = self.assertQueryBudget(
+            self.guest_client, reverse('api:post_list'), 1
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertQueryBudget(
+            self.reader_client, reverse('api:follow_feed'), 3
+        )
+
+    def test_api_details(self):
+        """Проверка отдельных постов, групп и профилей."""
+        _, post = self.get_json(
+            reverse('api:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertEqual(post['text'], self.post.text)
+        self.assertEqual(post['group'], self.group.slug)
+        _, group = self.get_json(
+            reverse('api:group_detail', kwargs={'slug': self.group.slug})
+        )
+        self.assertEqual(group['title'], self.group.title)
+        _, profile = self.get_json(
+            reverse('api:profile_detail', kwargs={'username': 'author'})
+        )
+        self.assertEqual(profile['post_count'], POSTS_COUNT)
+        self.assertEqual(profile['follower_count'], 1)
+
+    def test_api_nested_lists(self):
+        """Проверка постов группы и автора и комментариев поста."""
+        urls = {
+            reverse('api:group_posts', kwargs={'slug': self.group.slug}):
+                POSTS_COUNT,
+            reverse('api:profile_posts', kwargs={'username': 'reader'}): 0,
+            reverse('api:post_comments', kwargs={'post_id': self.post.pk}):
+                1,
+            reverse('api:group_list'): 1,
+        }
+        for url, count in urls.items():
+            with self.subTest(url=url):
+                _, data = self.get_json(url)
+                self.assertEqual(len(data['results']), count)
+
+    def test_api_follow_feed(self):
+        """Проверка ленты подписок и её закрытости для гостей."""
+        response, _ = self.get_json(reverse('api:follow_feed'))
+        self.assertEqual(response.status_code, 401)
+        for materialized in (True, False):
+            with self.subTest(materialized=materialized):
+                with override_settings(
+                    FOLLOW_FEED_MATERIALIZED=materialized
+                ):
+                    _, data = self.get_json(
+                        reverse('api:follow_feed'), self.reader_client
+                    )
+                self.assertEqual(len(data['results']), POSTS_COUNT)
+
+    def test_api_errors(self):
+        """Проверка ответов 404 и 405 в формате JSON."""
+        response, data = self.get_json(
+            reverse('api:post_detail', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', data)
+        response = self.guest_client.post(reverse('api:post_list'))
+        self.assertEqual(response.status_code, 405)
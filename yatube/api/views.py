@@ -0,0 +1,215 @@
+import json
+
+from api.serializers import (CommentSerializer, GroupSerializer,
+                             PostSerializer, ProfileSerializer)
+from core.paginator import CursorPaginator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from posts.models import Comment, Group, Post, TimelineEntry, UserStats
+
+User = get_user_model()
+
+
+def _dumps(data):
+    return json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def error(message, status):
+    return JsonResponse(
+        {'detail': message}, status=status,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def not_found():
+    return error('Не найдено.', 404)
+
+
+def page_size(request):
+    try:
+        size = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        size = settings.API_PAGE_SIZE
+    return min(max(size, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def cursor_url(request, name, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    params[name] = cursor
+    return request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+
+
+def stream_page(page, objects, serializer, request):
+    """
+    Отдаёт страницу списка потоком.
+
+    Объекты читаются из базы и сериализуются по одному, так что ни
+    страница, ни документ целиком в памяти не собираются. Ссылки на
+    соседние страницы известны только после последней строки, поэтому
+    идут в конце документа.
+    """
+    yield '{"results":['
+    for index, obj in enumerate(objects):
+        yield (',' if index else '') + _dumps(serializer.to_dict(obj))
+    yield '],"next":{},"previous":{}}}'.format(
+        _dumps(cursor_url(request, 'after', page.next_cursor)),
+        _dumps(cursor_url(request, 'before', page.previous_cursor)),
+    )
+
+
+def list_response(request, queryset, serializer_class, ordering,
+                  prefix='', unwrap=None):
+    """
+    Страница списка по курсорам ``?after=``/``?before=``.
+
+    ``prefix`` и ``unwrap`` нужны, когда строки выборки — обёртки над
+    сериализуемыми объектами (например, записи ленты подписок).
+    """
+    try:
+        serializer = serializer_class.from_request(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    paginator = CursorPaginator(
+        serializer.prepare(queryset, prefix),
+        page_size(request),
+        ordering=ordering,
+    )
+    page = paginator.stream_page(
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    objects = map(unwrap, page) if unwrap else page
+    return StreamingHttpResponse(
+        stream_page(page, objects, serializer, request),
+        content_type='application/json',
+    )
+
+
+def detail_response(request, queryset, serializer_class, **lookup):
+    try:
+        serializer = serializer_class.from_request(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    obj = serializer.prepare(queryset).filter(**lookup).first()
+    if obj is None:
+        return not_found()
+    return JsonResponse(
+        serializer.to_dict(obj), encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+@require_GET
+def post_list(request):
+    return list_response(
+        request, Post.objects.all(), PostSerializer, ('-pub_date', '-pk')
+    )
+
+
+@require_GET
+def post_detail(request, post_id):
+    return detail_response(
+        request, Post.objects.all(), PostSerializer, pk=post_id
+    )
+
+
+@require_GET
+def post_comments(request, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return not_found()
+    return list_response(
+        request,
+        Comment.objects.filter(post=post_id),
+        CommentSerializer,
+        ('created', 'pk'),
+    )
+
+
+@require_GET
+def group_list(request):
+    return list_response(
+        request, Group.objects.all(), GroupSerializer, ('title', 'pk')
+    )
+
+
+@require_GET
+def group_detail(request, slug):
+    return detail_response(
+        request, Group.objects.all(), GroupSerializer, slug=slug
+    )
+
+
+@require_GET
+def group_posts(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return not_found()
+    return list_response(
+        request,
+        Post.objects.filter(group=group_id),
+        PostSerializer,
+        ('-pub_date', '-pk'),
+    )
+
+
+@require_GET
+def profile_detail(request, username):
+    try:
+        serializer = ProfileSerializer.from_request(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    author = User.objects.filter(username=username).first()
+    if author is None:
+        return not_found()
+    author.stats = UserStats.objects.for_user(author)
+    return JsonResponse(
+        serializer.to_dict(author),
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is None:
+        return not_found()
+    return list_response(
+        request,
+        Post.objects.filter(author=author_id),
+        PostSerializer,
+        ('-pub_date', '-pk'),
+    )
+
+
+@require_GET
+def follow_feed(request):
+    if not request.user.is_authenticated:
+        return error('Требуется авторизация.', 401)
+    if settings.FOLLOW_FEED_MATERIALIZED:
+        return list_response(
+            request,
+            TimelineEntry.objects.filter(
+                user=request.user
+            ).select_related('post'),
+            PostSerializer,
+            ('-pub_date', '-post_id'),
+            prefix='post__',
+            unwrap=lambda entry: entry.post,
+        )
+    return list_response(
+        request,
+        Post.objects.filter(author__following__user=request.user),
+        PostSerializer,
+        ('-pub_date', '-pk'),
+    )
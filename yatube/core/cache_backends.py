@@ -0,0 +1,321 @@
+"""
+Двухъярусный кеш: ограниченный LRU в памяти процесса перед общим кешем.
+
+Локальный ярус хранит значения не дольше ``LOCAL_TIMEOUT`` секунд и не
+больше ``LOCAL_MAX_ENTRIES`` записей; промахи идут в общий кеш
+(``SHARED`` — псевдоним из ``CACHES``). Значения лежат локально в
+сериализованном виде, как в ``LocMemCache``, чтобы запросы не делили
+один изменяемый объект.
+
+Записи и удаления рассылаются другим процессам через файл
+``BROADCAST_PATH``: каждая операция дописывает в него изменённые ключи,
+а процессы перед обращением к кешу дочитывают новые строки и выбрасывают
+эти ключи из своего яруса. Это локальная замена pub/sub; если строка
+всё же потеряется, устаревшее значение проживёт не дольше
+``LOCAL_TIMEOUT``. Каталог рассылки создаётся с правами ``0o700``, файл —
+``0o600``: ключи в нём не должны подделывать другие пользователи.
+
+``add`` и ``incr`` всегда выполняются в общем ярусе и атомарны ровно
+настолько, насколько атомарен он сам: для блокировок и счётчиков нужен
+memcached или redis, а не ``FileBasedCache``.
+"""
+import os
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+#   после такого размера файл рассылки начинается заново
+BROADCAST_MAX_BYTES = 1024 * 1024
+CLEAR_ALL = '*'
+
+_missing = object()
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED', 'shared')
+        self._local_max_entries = options.get('LOCAL_MAX_ENTRIES', 1000)
+        self._local_timeout = options.get('LOCAL_TIMEOUT', 5)
+        self._local_exclude = tuple(options.get('LOCAL_EXCLUDE', ()))
+        self._broadcast_path = options.get('BROADCAST_PATH')
+        self._local = OrderedDict()
+        self._lock = threading.RLock()
+        # Всё опубликованное до запуска старше нашего яруса.
+        self._broadcast_file = self._broadcast_position()
+        self._stats = Counter()
+
+    @property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    def _version(self, version):
+        return self.version if version is None else version
+
+    def _local_key(self, key, version):
+        local_key = self.make_key(key, version=version)
+        self.validate_key(local_key)
+        return local_key
+
+    def _is_local(self, key):
+        return not key.startswith(self._local_exclude)
+
+    # Локальный ярус.
+
+    def _local_get(self, local_key):
+        with self._lock:
+            entry = self._local.get(local_key)
+            if entry is None:
+                return _missing
+            expires, pickled = entry
+            if expires <= time.monotonic():
+                del self._local[local_key]
+                return _missing
+            self._local.move_to_end(local_key)
+        return pickle.loads(pickled)
+
+    def _local_set(self, local_key, value, timeout):
+        timeout = self._local_ttl(timeout)
+        if timeout <= 0:
+            self._local_delete([local_key])
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[local_key] = (time.monotonic() + timeout, pickled)
+            self._local.move_to_end(local_key)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_ttl(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._local_timeout
+        return min(timeout, self._local_timeout)
+
+    def _local_delete(self, local_keys):
+        with self._lock:
+            for local_key in local_keys:
+                self._local.pop(local_key, None)
+
+    # Рассылка сбросов между процессами.
+
+    def _publish(self, local_keys):
+        """Дописывает ключи в файл рассылки одной записью ``O_APPEND``."""
+        if not self._broadcast_path or not local_keys:
+            return
+        pid = os.getpid()
+        payload = ''.join(f'{pid} {key}\n' for key in local_keys).encode()
+        os.makedirs(
+            os.path.dirname(self._broadcast_path), 0o700, exist_ok=True
+        )
+        descriptor = os.open(
+            self._broadcast_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+            0o600,
+        )
+        try:
+            os.write(descriptor, payload)
+            size = os.fstat(descriptor).st_size
+        finally:
+            os.close(descriptor)
+        if size > BROADCAST_MAX_BYTES:
+            self._rotate()
+
+    def _rotate(self):
+        # Новый inode: читатели замечают подмену и очищают свой ярус.
+        fresh = f'{self._broadcast_path}.{os.getpid()}'
+        os.close(os.open(fresh, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600))
+        os.replace(fresh, self._broadcast_path)
+
+    def _broadcast_position(self):
+        if not self._broadcast_path:
+            return None
+        try:
+            stat = os.stat(self._broadcast_path)
+        except FileNotFoundError:
+            return None, 0
+        return stat.st_ino, stat.st_size
+
+    def _sync(self):
+        """Применяет сбросы, опубликованные другими процессами."""
+        if not self._broadcast_path:
+            return
+        try:
+            stat = os.stat(self._broadcast_path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            inode, offset = self._broadcast_file
+            if inode is None:
+                # Файл появился впервые: читаем его с начала.
+                inode = stat.st_ino
+            if inode != stat.st_ino or stat.st_size < offset:
+                self._local.clear()
+                inode, offset = stat.st_ino, 0
+            if stat.st_size == offset:
+                self._broadcast_file = (inode, offset)
+                return
+            with open(self._broadcast_path, 'rb') as broadcast:
+                broadcast.seek(offset)
+                data = broadcast.read(stat.st_size - offset)
+            complete = data.rfind(b'\n') + 1
+            self._broadcast_file = (inode, offset + complete)
+            own = str(os.getpid())
+            for line in data[:complete].decode().splitlines():
+                pid, _, local_key = line.partition(' ')
+                if pid == own:
+                    continue
+                if local_key == CLEAR_ALL:
+                    self._local.clear()
+                else:
+                    self._local.pop(local_key, None)
+
+    # Интерфейс BaseCache.
+
+    def get(self, key, default=None, version=None):
+        version = self._version(version)
+        local_key = self._local_key(key, version)
+        self._sync()
+        if self._is_local(key):
+            value = self._local_get(local_key)
+            if value is not _missing:
+                self._stats['local_hits'] += 1
+                return value
+        value = self.shared.get(key, _missing, version=version)
+        if value is _missing:
+            self._stats['misses'] += 1
+            return default
+        self._stats['shared_hits'] += 1
+        if self._is_local(key):
+            self._local_set(local_key, value, None)
+        return value
+
+    def get_many(self, keys, version=None):
+        version = self._version(version)
+        self._sync()
+        found, remote = {}, []
+        for key in keys:
+            value = _missing
+            if self._is_local(key):
+                value = self._local_get(self._local_key(key, version))
+            if value is _missing:
+                remote.append(key)
+            else:
+                found[key] = value
+        self._stats['local_hits'] += len(found)
+        if remote:
+            fetched = self.shared.get_many(remote, version=version)
+            self._stats['shared_hits'] += len(fetched)
+            self._stats['misses'] += len(remote) - len(fetched)
+            for key, value in fetched.items():
+                if self._is_local(key):
+                    self._local_set(self._local_key(key, version), value, None)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self._version(version)
+        local_key = self._local_key(key, version)
+        self.shared.set(key, value, timeout, version=version)
+        if self._is_local(key):
+            self._local_set(local_key, value, timeout)
+        self._publish([local_key])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self._version(version)
+        failed = self.shared.set_many(data, timeout, version=version) or []
+        local_keys = []
+        for key, value in data.items():
+            local_key = self._local_key(key, version)
+            local_keys.append(local_key)
+            if key in failed:
+                self._local_delete([local_key])
+            elif self._is_local(key):
+                self._local_set(local_key, value, timeout)
+        self._publish(local_keys)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self._version(version)
+        added = self.shared.add(key, value, timeout, version=version)
+        if added:
+            local_key = self._local_key(key, version)
+            self._local_delete([local_key])
+            self._publish([local_key])
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        version = self._version(version)
+        touched = self.shared.touch(key, timeout, version=version)
+        self._local_delete([self._local_key(key, version)])
+        return touched
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def delete_many(self, keys, version=None):
+        version = self._version(version)
+        keys = list(keys)
+        self.shared.delete_many(keys, version=version)
+        local_keys = [self._local_key(key, version) for key in keys]
+        self._local_delete(local_keys)
+        self._publish(local_keys)
+
+    def has_key(self, key, version=None):
+        version = self._version(version)
+        self._sync()
+        if (self._is_local(key)
+                and self._local_get(self._local_key(key, version))
+                is not _missing):
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        version = self._version(version)
+        value = self.shared.incr(key, delta, version=version)
+        if self._is_local(key):
+            local_key = self._local_key(key, version)
+            self._local_delete([local_key])
+            self._publish([local_key])
+        return value
+
+    def decr(self, key, delta=1, version=None):
+        return self.incr(key, -delta, version=version)
+
+    def clear(self):
+        self.shared.clear()
+        with self._lock:
+            self._local.clear()
+        self._publish([CLEAR_ALL])
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+    def tier_stats(self, reset=False):
+        """Попадания по ярусам в этом процессе и их доли."""
+        with self._lock:
+            stats = dict(self._stats)
+            if reset:
+                self._stats.clear()
+        local_hits = stats.get('local_hits', 0)
+        shared_hits = stats.get('shared_hits', 0)
+        lookups = local_hits + shared_hits + stats.get('misses', 0)
+        shared_lookups = lookups - local_hits
+        return {
+            'local_hits': local_hits,
+            'shared_hits': shared_hits,
+            'misses': stats.get('misses', 0),
+            'local_entries': len(self._local),
+            'local_hit_ratio': (
+                round(local_hits / lookups, 3) if lookups else None
+            ),
+            'shared_hit_ratio': (
+                round(shared_hits / shared_lookups, 3)
+                if shared_lookups else None
+            ),
+        }
@@ -0,0 +1,14 @@
+from django.conf import settings
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Применяет ``SQLITE_PRAGMAS`` к каждому новому соединению с SQLite.
+
+    Прагмы выполняются напрямую через драйвер, чтобы не попадать в
+    счётчики запросов и профилирование.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,132 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections
+from django.test.utils import override_settings
+from posts.models import Post
+
+User = get_user_model()
+
+#   настройки SQLite по умолчанию для сравнения
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'busy_timeout': 5000,
+}
+
+WRITER_USERNAME = 'benchmark_sqlite_writer'
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет пропускную способность читателей ленты при активных '
+        'писателях с прагмами SQLITE_PRAGMAS и с настройками по умолчанию'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=5.0,
+            help='Длительность замера каждого режима в секундах',
+        )
+
+    def reader(self, deadline, stats):
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    list(Post.objects.select_related('author', 'group')[
+                        :settings.POSTS_PER_PAGE
+                    ])
+                except OperationalError:
+                    stats['errors'] += 1
+                    continue
+                stats['latencies'].append(
+                    (time.perf_counter() - started) * 1000
+                )
+        finally:
+            connection.close()
+
+    def writer(self, deadline, stats, author):
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    Post.objects.create(
+                        text='Замер конкурентной записи', author=author
+                    )
+                except OperationalError:
+                    stats['errors'] += 1
+                    continue
+                stats['writes'] += 1
+        finally:
+            connection.close()
+
+    def run_mode(self, author, options):
+        deadline = time.perf_counter() + options['duration']
+        readers = [
+            {'latencies': [], 'errors': 0} for _ in range(options['readers'])
+        ]
+        writers = [
+            {'writes': 0, 'errors': 0} for _ in range(options['writers'])
+        ]
+        threads = [
+            threading.Thread(target=self.reader, args=(deadline, stats))
+            for stats in readers
+        ] + [
+            threading.Thread(
+                target=self.writer, args=(deadline, stats, author)
+            )
+            for stats in writers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latencies = sorted(
+            value for stats in readers for value in stats['latencies']
+        ) or [0.0]
+        duration = options['duration']
+        return {
+            'reads_per_second': len(latencies) / duration,
+            'read_p50_ms': statistics.median(latencies),
+            'read_p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+            'writes_per_second': (
+                sum(stats['writes'] for stats in writers) / duration
+            ),
+            'errors': sum(
+                stats['errors'] for stats in readers + writers
+            ),
+        }
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write('Замер имеет смысл только для SQLite.')
+            return
+        author, _ = User.objects.get_or_create(username=WRITER_USERNAME)
+        modes = (
+            ('default', DEFAULT_PRAGMAS),
+            ('tuned', settings.SQLITE_PRAGMAS),
+        )
+        try:
+            for name, pragmas in modes:
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    # Новые соединения получат прагмы режима.
+                    connections.close_all()
+                    result = self.run_mode(author, options)
+                self.stdout.write(
+                    f'{name:>8}: чтений {result["reads_per_second"]:.0f}/с '
+                    f'(p50 {result["read_p50_ms"]:.2f} мс, '
+                    f'p95 {result["read_p95_ms"]:.2f} мс), '
+                    f'записей {result["writes_per_second"]:.0f}/с, '
+                    f'ошибок {result["errors"]}'
+                )
+        finally:
+            connections.close_all()
+            author.delete()
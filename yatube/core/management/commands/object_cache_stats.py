@@ -0,0 +1,25 @@
+import json
+
+from core import object_cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = 'Выводит счётчики попаданий и промахов кеша объектов в JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода',
+        )
+
+    def handle(self, *args, **options):
+        counters = object_cache.stats(reset=options['reset'])
+        for outcomes in counters.values():
+            lookups = sum(outcomes.values())
+            hits = lookups - outcomes['miss']
+            outcomes['hit_ratio'] = (
+                round(hits / lookups, 3) if lookups else None
+            )
+        self.stdout.write(json.dumps(counters, indent=2))
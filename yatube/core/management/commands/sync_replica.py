@@ -0,0 +1,58 @@
+import sqlite3
+import time
+
+from core.routers import sync_marker
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в реплики через backup API '
+        '(локальная замена репликации)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            action='append',
+            help='Реплика для синхронизации, по умолчанию все реплики',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять синхронизацию каждые N секунд',
+        )
+
+    def sync(self, alias):
+        database = settings.DATABASES.get(alias)
+        if database is None or not database['ENGINE'].endswith('sqlite3'):
+            raise CommandError(f'{alias}: нужна SQLite-реплика из DATABASES.')
+        source = connections['default']
+        source.ensure_connection()
+        synced_at = time.time()
+        target = sqlite3.connect(database['NAME'])
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
+        with open(sync_marker(alias), 'w') as marker:
+            marker.write(repr(synced_at))
+
+    def handle(self, *args, **options):
+        aliases = options['database'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS).')
+        while True:
+            started = time.perf_counter()
+            for alias in aliases:
+                self.sync(alias)
+            self.stdout.write(self.style.SUCCESS(
+                f'Синхронизировано реплик: {len(aliases)} за '
+                f'{(time.perf_counter() - started) * 1000:.0f} мс'
+            ))
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,102 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('yatube.profiling')
+
+_local = threading.local()
+
+
+class RequestProfile:
+    """Счётчики одного запроса: SQL, рендер шаблонов и общее время."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_sql = ''
+        self.render_time = 0.0
+        self.render_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.sql_time += duration
+            if duration > self.slowest_time:
+                self.slowest_time = duration
+                self.slowest_sql = sql
+
+
+def current_profile():
+    """Профиль текущего запроса или ``None``, если он не профилируется."""
+    return getattr(_local, 'profile', None)
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class RequestProfilingMiddleware:
+    """
+    Профилирование выборки запросов.
+
+    Для доли запросов ``PROFILING_SAMPLE_RATE`` считает SQL-запросы и их
+    время, время рендера шаблонов и работы представления, отдаёт их в
+    заголовке ``Server-Timing`` и пишет строку JSON в лог
+    ``yatube.profiling``. Время рендера считает шаблонный бэкенд
+    ``core.template_backends.ProfiledDjangoTemplates``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+        profile = RequestProfile()
+        _local.profile = profile
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(profile)
+                    )
+                response = self.get_response(request)
+        finally:
+            _local.profile = None
+        total = time.perf_counter() - started
+        self.report(request, response, profile, total)
+        return response
+
+    def report(self, request, response, profile, total):
+        view_time = total - profile.render_time
+        queries = f'{profile.queries} queries'
+        response['Server-Timing'] = ', '.join((
+            f'sql;dur={_ms(profile.sql_time)};desc="{queries}"',
+            f'tpl;dur={_ms(profile.render_time)}',
+            f'view;dur={_ms(view_time)}',
+            f'total;dur={_ms(total)}',
+        ))
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': profile.queries,
+            'sql_ms': _ms(profile.sql_time),
+            'template_ms': _ms(profile.render_time),
+            'view_ms': _ms(view_time),
+            'total_ms': _ms(total),
+            'slowest_query_ms': _ms(profile.slowest_time),
+            'slowest_query': profile.slowest_sql[:500],
+        }, ensure_ascii=False))
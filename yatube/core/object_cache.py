@@ -0,0 +1,229 @@
+"""
+Кеш объектов моделей по ключевым полям (первичный ключ, slug, username).
+
+Запись по первичному ключу хранит сам объект, записи по остальным полям —
+только первичный ключ, поэтому после переименования старое значение
+перестаёт совпадать с объектом и просто даёт промах. Отсутствующие объекты
+тоже кешируются (на ``OBJECT_CACHE_MISSING_TIMEOUT``), чтобы повторные
+404 не доходили до базы.
+
+Для моделей с ``only`` кешируются лишь перечисленные поля: пароли и
+адреса пользователей в общий кеш не попадают. Счётчики попаданий
+копятся в памяти процесса и сбрасываются в общий кеш пачкой раз в
+``OBJECT_CACHE_STATS_FLUSH`` поисков, а не записью на каждый поиск.
+
+Кеш заполняется только из основной базы, даже когда чтение запроса
+направлено на реплику. Записи сбрасываются сигналами
+``post_save``/``post_delete``; изменения в обход сигналов
+(``bulk_create``, ``update``) требуют ``invalidate`` или
+``bump_version``, которая разом устаревает весь кеш.
+"""
+import hashlib
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+
+VERSION_KEY = 'object_cache:version'
+ENTRY_KEY = 'object_cache:{version}:{label}:{field}:{value}'
+STATS_KEY = 'object_cache:stats:{label}:{outcome}'
+OUTCOMES = ('hit', 'miss', 'missing_hit')
+
+#   маркер отсутствующего объекта: None кеш не отличает от промаха
+MISSING = 'object_cache:missing'
+
+_registry = {}
+_only = {}
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+
+
+def register(model, *fields, only=None):
+    """
+    Разрешает поиск ``model`` по ``fields`` и подключает сброс записей.
+
+    ``only`` — поля, которые загружаются и кешируются (по умолчанию все);
+    ключевые поля добавляются к ним сами.
+    """
+    pk_name = model._meta.pk.attname
+    _registry[model] = tuple(
+        pk_name if field == 'pk' else field for field in ('pk', *fields)
+    )
+    if only is not None:
+        _only[model] = tuple(dict.fromkeys((*_registry[model], *only)))
+    dispatch_uid = f'object_cache:{model._meta.label_lower}'
+    post_save.connect(
+        _invalidate_receiver, sender=model, dispatch_uid=dispatch_uid
+    )
+    post_delete.connect(
+        _invalidate_receiver, sender=model, dispatch_uid=dispatch_uid
+    )
+
+
+def _invalidate_receiver(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate(instance)
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    """Устаревает все записи кеша объектов."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 2, None)
+
+
+def _key(version, model, field, value):
+    if field != model._meta.pk.attname:
+        # Имена пользователей могут содержать пробелы и кириллицу.
+        value = hashlib.md5(str(value).encode()).hexdigest()
+    return ENTRY_KEY.format(
+        version=version, label=model._meta.label_lower,
+        field=field, value=value,
+    )
+
+
+def _count(model, outcome):
+    key = STATS_KEY.format(label=model._meta.label_lower, outcome=outcome)
+    with _pending_lock:
+        _pending[key] += 1
+        full = sum(_pending.values()) >= settings.OBJECT_CACHE_STATS_FLUSH
+    if full:
+        flush_stats()
+
+
+def flush_stats():
+    """Переносит накопленные в процессе счётчики в общий кеш."""
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    for key, amount in pending.items():
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            if not cache.add(key, amount, None):
+                cache.incr(key, amount)
+
+
+def stats(reset=False):
+    """Счётчики попаданий и промахов по моделям."""
+    flush_stats()
+    keys = {
+        (model._meta.label_lower, outcome): STATS_KEY.format(
+            label=model._meta.label_lower, outcome=outcome
+        )
+        for model in _registry for outcome in OUTCOMES
+    }
+    values = cache.get_many(keys.values())
+    result = {}
+    for (label, outcome), key in keys.items():
+        result.setdefault(label, {})[outcome] = values.get(key, 0)
+    if reset:
+        cache.delete_many(keys.values())
+    return result
+
+
+def _lookup_field(model, lookup):
+    if model not in _registry:
+        raise ValueError(f'{model.__name__} не зарегистрирована в кеше.')
+    if len(lookup) != 1:
+        raise ValueError('Нужно ровно одно поле поиска.')
+    (field, value), = lookup.items()
+    fields = _registry[model]
+    if field == 'pk':
+        field = fields[0]
+    if field not in fields:
+        raise ValueError(f'Поиск {model.__name__} по {field} не кешируется.')
+    field_obj = model._meta.get_field(field)
+    return field, field_obj.to_python(value)
+
+
+def get_object(model, **lookup):
+    """Объект ``model`` по одному ключевому полю или ``None``."""
+    field, value = _lookup_field(model, lookup)
+    pk_name = _registry[model][0]
+    version = _version()
+    key = _key(version, model, field, value)
+    pk = value if field == pk_name else cache.get(key)
+    if pk == MISSING:
+        _count(model, 'missing_hit')
+        return None
+    if pk is not None:
+        obj = cache.get(_key(version, model, pk_name, pk))
+        if obj == MISSING and field == pk_name:
+            _count(model, 'missing_hit')
+            return None
+        if (isinstance(obj, model)
+                and getattr(obj, field) == value):
+            _count(model, 'hit')
+            return obj
+    _count(model, 'miss')
+    # Только из основной базы: отставшая реплика вернула бы старую версию,
+    # которая после сброса в invalidate прожила бы в кеше весь таймаут.
+    queryset = model._default_manager.using(DEFAULT_DB_ALIAS)
+    if model in _only:
+        queryset = queryset.only(*_only[model])
+    obj = queryset.filter(**{field: value}).first()
+    if obj is None:
+        cache.set(key, MISSING, settings.OBJECT_CACHE_MISSING_TIMEOUT)
+        return None
+    entries = {_key(version, model, pk_name, obj.pk): obj}
+    if field != pk_name:
+        entries[key] = obj.pk
+    cache.set_many(entries, settings.OBJECT_CACHE_TIMEOUT)
+    return obj
+
+
+def get_object_or_404(model, related=(), **lookup):
+    """
+    Аналог ``django.shortcuts.get_object_or_404`` через кеш.
+
+    Внешние ключи из ``related`` подставляются тоже из кеша, их модели
+    должны быть зарегистрированы.
+    """
+    obj = get_object(model, **lookup)
+    if obj is None:
+        raise Http404(f'{model._meta.object_name} не найден.')
+    return load_related(obj, related)
+
+
+def load_related(obj, related):
+    """Подставляет объекты внешних ключей ``related`` из кеша."""
+    for name in related:
+        field = obj._meta.get_field(name)
+        related_id = getattr(obj, field.attname)
+        if related_id is not None:
+            related_obj = get_object(field.related_model, pk=related_id)
+            if related_obj is not None:
+                setattr(obj, name, related_obj)
+    return obj
+
+
+def invalidate(instance):
+    """Сбрасывает записи объекта по всем его ключевым полям."""
+    model = type(instance)
+    fields = _registry.get(model)
+    if fields is None:
+        return
+    version = _version()
+    keys = [
+        _key(version, model, field, getattr(instance, field))
+        for field in fields
+        if field in instance.__dict__
+    ]
+    cache.delete_many(keys)
+    # Параллельный запрос мог закешировать старую версию до коммита.
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,257 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+
+#   типы, допустимые в значениях курсора
+CURSOR_SCALARS = (str, int, float)
+
+
+def cursor_page(rows, number, paginator, has_next, has_previous):
+    """
+    Страница ``CursorPaginator``.
+
+    Страница, открытая по курсору, может не знать своего номера, а
+    ``count`` пагинатор не считает, поэтому соседние страницы
+    определяются по курсорам. Методы заменяются на экземпляре, а не в
+    подклассе: шаблоны и тесты проекта ожидают ровно ``Page``.
+    """
+    page = Page(rows, number, paginator)
+    page.next_cursor = (
+        paginator.encode_cursor(rows[-1]) if has_next and rows else None
+    )
+    page.previous_cursor = (
+        paginator.encode_cursor(rows[0]) if has_previous and rows else None
+    )
+
+    def next_page_number():
+        if not has_next or number is None:
+            raise InvalidPage('Номер следующей страницы неизвестен.')
+        return number + 1
+
+    def previous_page_number():
+        if not has_previous or number is None:
+            raise InvalidPage('Номер предыдущей страницы неизвестен.')
+        return number - 1
+
+    page.has_next = lambda: has_next
+    page.has_previous = lambda: has_previous
+    page.has_other_pages = lambda: has_next or has_previous
+    page.next_page_number = next_page_number
+    page.previous_page_number = previous_page_number
+    return page
+
+
+class CursorStream:
+    """
+    Страница ``CursorPaginator``, которая читается потоком.
+
+    Строки идут из ``QuerySet.iterator()``, так что в памяти держится
+    только текущая. Курсоры соседних страниц известны, когда итерация
+    закончена: до этого ``next_cursor`` и ``previous_cursor`` пусты.
+    """
+
+    def __init__(self, paginator, queryset, has_previous, has_next=None):
+        self.paginator = paginator
+        self.queryset = queryset
+        self.has_previous = has_previous
+        self.has_next = has_next
+        self.next_cursor = None
+        self.previous_cursor = None
+
+    def __iter__(self):
+        per_page = self.paginator.per_page
+        # Если про следующую страницу ничего не известно, лишняя строка
+        # показывает, есть ли она.
+        limit = per_page + 1 if self.has_next is None else per_page
+        first = last = None
+        for index, row in enumerate(self.queryset[:limit].iterator()):
+            if index == per_page:
+                self.has_next = True
+                break
+            if first is None:
+                first = row
+            last = row
+            yield row
+        if first is not None and self.has_previous:
+            self.previous_cursor = self.paginator.encode_cursor(first)
+        if last is not None and self.has_next:
+            self.next_cursor = self.paginator.encode_cursor(last)
+
+
+class CursorPaginator(Paginator):
+    """
+    Пагинатор по ключу сортировки (keyset pagination).
+
+    Страницы выбираются условием «строго после/до ключа» вместо OFFSET,
+    поэтому стоимость страницы не растёт с её глубиной, а COUNT(*) не нужен.
+    Номера страниц до ``offset_pages`` обслуживаются обычным OFFSET ради
+    старых ссылок вида ``?page=N``, более глубокие переводятся на курсор.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-pk'),
+                 offset_pages=5):
+        directions = {name.startswith('-') for name in ordering}
+        if len(directions) != 1:
+            raise ValueError('Все поля ключа должны сортироваться '
+                             'в одном направлении.')
+        self.ordering = tuple(ordering)
+        self.descending = directions.pop()
+        self.fields = tuple(name.lstrip('-') for name in ordering)
+        self.offset_pages = offset_pages
+        super().__init__(object_list.order_by(*self.ordering), per_page)
+
+    def get_page(self, number=None, after=None, before=None):
+        """
+        Возвращает страницу, не выбрасывая исключений на мусорный ввод.
+
+        Курсоры ``after``/``before`` имеют приоритет над номером страницы.
+        """
+        for cursor, forward in ((after, True), (before, False)):
+            key = self.decode_cursor(cursor) if cursor else None
+            if key is not None:
+                return self._seek_page(key, forward=forward)
+        if number == 'last':
+            return self._last_page()
+        try:
+            number = max(int(number), 1)
+        except (TypeError, ValueError):
+            number = 1
+        if number <= self.offset_pages:
+            return self._offset_page(number)
+        offset = (number - 1) * self.per_page
+        # Узкая выборка одного ключа по индексу вместо полных строк.
+        keys = list(self.object_list.values_list(*self.fields)[
+            offset - 1:offset
+        ])
+        if not keys:
+            return self._last_page()
+        return self._seek_page(keys[0], forward=True, number=number)
+
+    def stream_page(self, after=None, before=None):
+        """
+        Страница по курсору для потоковой отдачи (``CursorStream``).
+
+        Номера страниц не поддерживаются. Страница ``before`` выбирается
+        подзапросом по ключам в обратном порядке, чтобы и её строки шли
+        по возрастанию без разворота списка в памяти.
+        """
+        key = self.decode_cursor(after) if after else None
+        if key is not None:
+            return CursorStream(
+                self,
+                self.object_list.filter(self._seek_filter(key, True)),
+                has_previous=True,
+            )
+        key = self.decode_cursor(before) if before else None
+        if key is not None:
+            backward = self.object_list.filter(
+                self._seek_filter(key, False)
+            ).order_by(*self._reversed_ordering())
+            # Как в _seek_page: у начала ленты отдаётся первая страница.
+            if list(backward.values_list('pk')[
+                self.per_page:self.per_page + 1
+            ]):
+                return CursorStream(
+                    self,
+                    self.object_list.filter(
+                        pk__in=backward.values('pk')[:self.per_page]
+                    ),
+                    has_previous=True,
+                    has_next=True,
+                )
+        return CursorStream(self, self.object_list, has_previous=False)
+
+    def encode_cursor(self, obj):
+        values = [self._serialize(getattr(obj, name)) for name in self.fields]
+        raw = json.dumps(values, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        padding = '=' * (-len(cursor) % 4)
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        except (binascii.Error, ValueError):
+            return None
+        if (not isinstance(values, list)
+                or len(values) != len(self.fields)
+                or not all(isinstance(value, CURSOR_SCALARS)
+                           for value in values)):
+            return None
+        model_meta = self.object_list.model._meta
+        try:
+            key = tuple(
+                model_meta.get_field(name).to_python(value)
+                for name, value in zip(self._model_fields(), values)
+            )
+        except (ValidationError, TypeError, ValueError):
+            return None
+        if any(value is None for value in key):
+            return None
+        return key
+
+    def _model_fields(self):
+        pk_name = self.object_list.model._meta.pk.name
+        return [pk_name if name == 'pk' else name for name in self.fields]
+
+    @staticmethod
+    def _serialize(value):
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value
+
+    def _seek_filter(self, key, forward):
+        lookup = 'lt' if forward == self.descending else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            equal = dict(zip(self.fields[:index], key[:index]))
+            equal[f'{name}__{lookup}'] = key[index]
+            condition |= Q(**equal)
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def _seek_page(self, key, forward, number=None):
+        queryset = self.object_list.filter(self._seek_filter(key, forward))
+        if not forward:
+            queryset = queryset.order_by(*self._reversed_ordering())
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if forward:
+            return self._build_page(rows, number, has_more, True)
+        rows.reverse()
+        if not has_more:
+            # Дошли до начала ленты: показываем настоящую первую страницу.
+            return self._offset_page(1)
+        return self._build_page(rows, number, True, has_more)
+
+    def _offset_page(self, number):
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            return self._last_page()
+        has_next = len(rows) > self.per_page
+        return self._build_page(
+            rows[:self.per_page], number, has_next, number > 1
+        )
+
+    def _last_page(self):
+        # Как в Paginator: на последней странице только остаток, поэтому
+        # здесь, в отличие от остальных страниц, нужен COUNT(*).
+        number = self.num_pages
+        remainder = self.count - (number - 1) * self.per_page
+        queryset = self.object_list.order_by(*self._reversed_ordering())
+        rows = list(queryset[:remainder])
+        rows.reverse()
+        return self._build_page(rows, number, False, number > 1)
+
+    def _build_page(self, rows, number, has_next, has_previous):
+        return cursor_page(rows, number, self, has_next, has_previous)
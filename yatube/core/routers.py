@@ -0,0 +1,121 @@
+"""
+Маршрутизация чтения на реплики.
+
+Реплика выбирается один раз на запрос в ``ReplicaRoutingMiddleware`` и
+только для представлений из ``REPLICA_VIEWS``; всё остальное, а также
+любые записи, идёт в основную базу. После записи сессия закрепляется за
+основной базой на ``REPLICA_PIN_SECONDS``, чтобы пользователь сразу
+видел свои изменения. Закрепляются только уже существующие сессии и
+сессии авторизованных пользователей: анонимный запрос не должен
+получать cookie из-за побочной записи (например, ленивого пересчёта
+счётчиков).
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+
+PIN_SESSION_KEY = '_primary_pinned_until'
+
+_state = threading.local()
+
+
+def sync_marker(alias):
+    """Файл с временем последней синхронизации SQLite-реплики."""
+    return f'{settings.DATABASES[alias]["NAME"]}.synced'
+
+
+def replica_lag(alias):
+    """
+    Отставание реплики в секундах или ``None``, если оно неизвестно.
+
+    Для SQLite-копии это время с последнего ``sync_replica``; прочие
+    реплики считаются синхронными.
+    """
+    database = settings.DATABASES[alias]
+    if not database['ENGINE'].endswith('sqlite3'):
+        return 0.0
+    try:
+        with open(sync_marker(alias)) as marker:
+            synced_at = float(marker.read())
+    except (OSError, ValueError):
+        return None
+    return max(time.time() - synced_at, 0.0)
+
+
+def choose_replica():
+    """Случайная реплика с допустимым отставанием или ``None``."""
+    healthy = []
+    for alias in settings.DATABASE_REPLICAS:
+        lag = replica_lag(alias)
+        if lag is not None and lag <= settings.REPLICA_MAX_LAG:
+            healthy.append(alias)
+    return random.choice(healthy) if healthy else None
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return getattr(_state, 'read_alias', None)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Выбирает базу для чтения и закрепляет сессию после записей."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.read_alias = None
+        _state.wrote = False
+        request.read_database = None
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = _state.wrote
+            _state.read_alias = None
+            _state.wrote = False
+        if wrote and settings.DATABASE_REPLICAS and self.can_pin(request):
+            request.session[PIN_SESSION_KEY] = (
+                time.time() + settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (not settings.DATABASE_REPLICAS
+                or request.method not in ('GET', 'HEAD')
+                or request.resolver_match.view_name
+                not in settings.REPLICA_VIEWS
+                or self.pinned(request)):
+            return None
+        _state.read_alias = request.read_database = choose_replica()
+        return None
+
+    @staticmethod
+    def can_pin(request):
+        session = getattr(request, 'session', None)
+        if session is None:
+            return False
+        user = getattr(request, 'user', None)
+        return session.session_key is not None or bool(
+            user and user.is_authenticated
+        )
+
+    @staticmethod
+    def pinned(request):
+        session = getattr(request, 'session', None)
+        if session is None:
+            return False
+        return session.get(PIN_SESSION_KEY, 0) > time.time()
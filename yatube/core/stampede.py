@@ -0,0 +1,129 @@
+"""
+Защита кеша от «давки» при истечении записей.
+
+Запись хранит значение, момент истечения и время его вычисления:
+
+* незадолго до истечения один из запросов с вероятностью, растущей к
+  концу срока, пересчитывает значение заранее (XFetch: Vattani и др.,
+  «Optimal Probabilistic Cache Stampede Prevention»);
+* пересчитывает только тот, кто взял блокировку ``cache.add``, остальные
+  получают прежнее значение, которое хранится ещё
+  ``CACHE_STAMPEDE_GRACE`` секунд после истечения;
+* если значения нет совсем (новый ключ), остальные ждут результата
+  до ``CACHE_STAMPEDE_WAIT`` секунд и только потом считают сами.
+
+Единственность пересчёта держится на атомарном ``cache.add`` общего
+кеша (memcached, redis). С ``FileBasedCache`` между процессами это не
+гарантируется: защита только снижает число одновременных пересчётов.
+"""
+import hashlib
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+
+ENTRY_KEY = 'stampede:{key}'
+LOCK_KEY = 'stampede_lock:{key}'
+#   шаг опроса кеша, пока значение считает другой процесс
+WAIT_STEP = 0.05
+
+_missing = object()
+
+
+def _recompute_early(expires, delta, beta):
+    """XFetch: чем дольше считается значение, тем раньше его обновлять."""
+    gap = -delta * beta * math.log(random.random() or 1e-12)
+    return time.time() + gap >= expires
+
+
+def _compute(cache, key, compute, timeout):
+    started = time.time()
+    value = compute()
+    delta = time.time() - started
+    if timeout is None:
+        cache.set(key, (value, math.inf, delta), None)
+    else:
+        cache.set(
+            key,
+            (value, started + delta + timeout, delta),
+            timeout + settings.CACHE_STAMPEDE_GRACE,
+        )
+    return value
+
+
+def _wait(cache, key):
+    deadline = time.monotonic() + settings.CACHE_STAMPEDE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return _missing
+
+
+def fetch(key, compute, timeout, beta=None, cache=None, is_fresh=None):
+    """
+    Значение ``key`` из кеша или результат ``compute()``.
+
+    ``timeout`` — срок свежести в секундах: ``None`` — бессрочно,
+    ``0`` отключает кеш, как в ``{% cache %}``. Значение, для которого
+    ``is_fresh(value)`` ложно, пересчитывается как истёкшее: один
+    запрос считает заново, остальные получают прежнее значение.
+    """
+    cache = cache or default_cache
+    if timeout is not None and timeout <= 0:
+        return compute()
+    beta = settings.CACHE_STAMPEDE_BETA if beta is None else beta
+    entry_key = ENTRY_KEY.format(key=key)
+    lock_key = LOCK_KEY.format(key=key)
+    entry = cache.get(entry_key)
+    if entry is not None:
+        value, expires, delta = entry
+        if ((is_fresh is None or is_fresh(value))
+                and not _recompute_early(expires, delta, beta)):
+            return value
+    if cache.add(lock_key, True, settings.CACHE_STAMPEDE_LOCK_TIMEOUT):
+        try:
+            return _compute(cache, entry_key, compute, timeout)
+        finally:
+            cache.delete(lock_key)
+    if entry is not None:
+        # Пересчитывает другой процесс: отдаём прежнее значение.
+        return value
+    value = _wait(cache, entry_key)
+    if value is _missing:
+        value = _compute(cache, entry_key, compute, timeout)
+    return value
+
+
+def _default_key(func, args, kwargs):
+    raw = repr((args, sorted(kwargs.items()))).encode()
+    name = f'{func.__module__}.{func.__qualname__}'
+    return f'{name}:{hashlib.md5(raw).hexdigest()}'
+
+
+def cached(timeout, key=None, beta=None, cache=None):
+    """
+    Декоратор: результат функции кешируется через ``fetch``.
+
+    ``key(*args, **kwargs)`` строит ключ; по умолчанию это имя функции и
+    хеш ``repr`` аргументов.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = (
+                key(*args, **kwargs) if key
+                else _default_key(func, args, kwargs)
+            )
+            return fetch(
+                cache_key, lambda: func(*args, **kwargs), timeout,
+                beta=beta, cache=cache,
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,40 @@
+"""
+Шаблонный бэкенд Django, считающий время рендера для профилирования.
+
+Время попадает в профиль запроса ``RequestProfilingMiddleware``;
+вложенный рендер (шаблон, отрендеренный из тега другого шаблона)
+отдельно не суммируется.
+"""
+import time
+
+from core.middleware import current_profile
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+
+class ProfiledTemplate(Template):
+    def render(self, context=None, request=None):
+        profile = current_profile()
+        if profile is None:
+            return super().render(context, request)
+        profile.render_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            profile.render_depth -= 1
+            if not profile.render_depth:
+                profile.render_time += time.perf_counter() - started
+
+
+class ProfiledDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return ProfiledTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return ProfiledTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
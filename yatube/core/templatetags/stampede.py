@@ -0,0 +1,66 @@
+from core.stampede import fetch
+from django import template
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.template import TemplateSyntaxError, VariableDoesNotExist
+from django.templatetags.cache import CacheNode, do_cache
+
+register = template.Library()
+
+
+class StampedeCacheNode(CacheNode):
+    def resolve(self, variable, context):
+        try:
+            return variable.resolve(context)
+        except VariableDoesNotExist:
+            raise TemplateSyntaxError(
+                f'"cache" tag got an unknown variable: {variable.var!r}'
+            )
+
+    def fragment_cache(self, context):
+        if self.cache_name:
+            cache_name = self.resolve(self.cache_name, context)
+            try:
+                return caches[cache_name]
+            except InvalidCacheBackendError:
+                raise TemplateSyntaxError(
+                    f'Invalid cache name specified for cache tag: '
+                    f'{cache_name!r}'
+                )
+        try:
+            return caches['template_fragments']
+        except InvalidCacheBackendError:
+            return caches['default']
+
+    def render(self, context):
+        expire_time = self.resolve(self.expire_time_var, context)
+        if expire_time is not None:
+            try:
+                expire_time = int(expire_time)
+            except (ValueError, TypeError):
+                raise TemplateSyntaxError(
+                    f'"cache" tag got a non-integer timeout value: '
+                    f'{expire_time!r}'
+                )
+        vary_on = [variable.resolve(context) for variable in self.vary_on]
+        return fetch(
+            make_template_fragment_key(self.fragment_name, vary_on),
+            lambda: self.nodelist.render(context),
+            expire_time,
+            cache=self.fragment_cache(context),
+        )
+
+
+@register.tag('cache')
+def stampede_cache(parser, token):
+    """
+    Тот же ``{% cache %}``, но с защитой от одновременного пересчёта.
+
+    Синтаксис не отличается от встроенного тега: достаточно заменить
+    ``{% load cache %}`` на ``{% load stampede %}``.
+    """
+    node = do_cache(parser, token)
+    return StampedeCacheNode(
+        node.nodelist, node.expire_time_var, node.fragment_name,
+        node.vary_on, node.cache_name,
+    )
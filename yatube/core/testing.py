@@ -0,0 +1,23 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    Проверки бюджета SQL-запросов для TestCase.
+
+    Бюджет задаётся на страницу целиком и не должен зависеть от числа
+    объектов на ней: вернувшийся N+1 сразу выходит за его пределы.
+    """
+
+    def assertQueryBudget(self, client, url, budget, method='get', **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, **kwargs)
+        executed = [query['sql'] for query in queries.captured_queries]
+        self.assertLessEqual(
+            len(executed),
+            budget,
+            f'{url}: {len(executed)} запросов при бюджете {budget}:\n'
+            + '\n'.join(executed),
+        )
+        return response
@@ -0,0 +1,137 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from core import cache_backends
+from core.cache_backends import TwoTierCache
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        caches['shared'].clear()
+        self.cache = self.worker()
+
+    def worker(self, **options):
+        """Кеш отдельного процесса над общим ярусом."""
+        return TwoTierCache(None, {'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': 3,
+            'LOCAL_TIMEOUT': 5,
+            'LOCAL_EXCLUDE': ('counter:',),
+            'BROADCAST_PATH': os.path.join(self.directory, 'broadcast.log'),
+            **options,
+        }})
+
+    def in_other_process(self):
+        return mock.patch.object(
+            cache_backends.os, 'getpid', return_value=os.getpid() + 1
+        )
+
+    def test_shared_hit_fills_local_tier(self):
+        """Проверка, что попадание в общий ярус кешируется локально."""
+        caches['shared'].set('key', 'value')
+        self.assertEqual(self.cache.get('key'), 'value')
+        caches['shared'].delete('key')
+        self.assertEqual(self.cache.get('key'), 'value')
+        stats = self.cache.tier_stats()
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['local_hit_ratio'], 0.5)
+
+    def test_local_tier_is_bounded_lru(self):
+        """Проверка вытеснения давно не читанных ключей."""
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.cache.get('a')
+        self.cache.set('d', 'd')
+        self.assertEqual(self.cache.tier_stats()['local_entries'], 3)
+        self.cache.get_many(['a', 'b', 'c', 'd'])
+        stats = self.cache.tier_stats()
+        self.assertEqual(stats['local_hits'], 1 + 3)
+        self.assertEqual(stats['shared_hits'], 1)
+
+    def test_local_timeout(self):
+        """Проверка, что локальная копия живёт не дольше LOCAL_TIMEOUT."""
+        self.cache.set('key', 'value')
+        caches['shared'].set('key', 'changed')
+        later = cache_backends.time.monotonic() + 6
+        with mock.patch.object(
+            cache_backends.time, 'monotonic', return_value=later
+        ):
+            self.assertEqual(self.cache.get('key'), 'changed')
+
+    def test_values_are_not_shared_between_callers(self):
+        """Проверка, что изменение прочитанного объекта не портит кеш."""
+        self.cache.set('key', {'items': [1]})
+        self.cache.get('key')['items'].append(2)
+        self.assertEqual(self.cache.get('key'), {'items': [1]})
+
+    def test_excluded_keys_skip_local_tier(self):
+        """Проверка, что счётчики читаются только из общего яруса."""
+        self.cache.set('counter:hits', 1)
+        self.cache.incr('counter:hits')
+        caches['shared'].incr('counter:hits')
+        self.assertEqual(self.cache.get('counter:hits'), 3)
+        self.assertEqual(self.cache.tier_stats()['local_entries'], 0)
+
+    def test_invalidation_broadcast(self):
+        """Проверка, что запись другого процесса сбрасывает локальную копию."""
+        other = self.worker()
+        self.cache.set('key', 'old')
+        self.assertEqual(other.get('key'), 'old')
+        with self.in_other_process():
+            self.cache.set('key', 'new')
+        self.assertEqual(other.get('key'), 'new')
+        with self.in_other_process():
+            self.cache.delete_many(['key'])
+        self.assertIsNone(other.get('key'))
+
+    def test_clear_broadcast(self):
+        """Проверка, что очистка кеша доходит до других процессов."""
+        other = self.worker()
+        other.set_many({'a': 1, 'b': 2})
+        with self.in_other_process():
+            self.cache.clear()
+        self.assertEqual(other.get_many(['a', 'b']), {})
+
+    def test_broadcast_rotation_clears_local_tier(self):
+        """Проверка, что после ротации файла рассылки ярус очищается."""
+        other = self.worker()
+        other.set('key', 'old')
+        other.get('key')
+        with self.in_other_process(), \
+                mock.patch.object(cache_backends, 'BROADCAST_MAX_BYTES', 1):
+            self.cache.set('unrelated', 1)
+        caches['shared'].set('key', 'new')
+        self.assertEqual(other.get('key'), 'new')
+
+    def test_broadcast_file_is_private(self):
+        """Проверка, что каталог и файл рассылки закрыты от других."""
+        path = os.path.join(self.directory, 'private', 'broadcast.log')
+        cache = self.worker(BROADCAST_PATH=path)
+        cache.set('key', 'value')
+        self.assertEqual(os.stat(os.path.dirname(path)).st_mode & 0o777, 0o700)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        with mock.patch.object(cache_backends, 'BROADCAST_MAX_BYTES', 1):
+            cache.set('key', 'other')
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_get_many_and_set_many(self):
+        """Проверка пакетных операций через оба яруса."""
+        self.cache.set_many({'a': 1, 'b': None})
+        caches['shared'].set('c', 3)
+        self.assertEqual(
+            self.cache.get_many(['a', 'b', 'c', 'missing']),
+            {'a': 1, 'b': None, 'c': 3},
+        )
+        stats = self.cache.tier_stats(reset=True)
+        self.assertEqual(
+            (stats['local_hits'], stats['shared_hits'], stats['misses']),
+            (2, 1, 1),
+        )
+        self.assertEqual(self.cache.tier_stats()['misses'], 0)
@@ -0,0 +1,32 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+
+
+class SqlitePragmasTests(TestCase):
+    def open_connection(self):
+        wrapper = connection.copy()
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        return wrapper.connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={
+        'synchronous': 'NORMAL',
+        'busy_timeout': 1234,
+        'cache_size': -2000,
+        'temp_store': 'MEMORY',
+    })
+    def test_pragmas_applied_to_new_connections(self):
+        """Проверка, что новое соединение получает прагмы из настроек."""
+        wrapper = self.open_connection()
+        expected = {
+            'synchronous': 1,
+            'busy_timeout': 1234,
+            'cache_size': -2000,
+            'temp_store': 2,
+        }
+        for name, value in expected.items():
+            with self.subTest(pragma=name):
+                self.assertEqual(self.pragma(wrapper, name), value)
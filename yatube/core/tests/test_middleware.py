@@ -0,0 +1,57 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template.backends.django import Template
+from django.test import Client, TestCase, override_settings
+from posts.models import Post
+
+User = get_user_model()
+
+
+class RequestProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        Post.objects.create(text='Тестовый пост', author=author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_profiling_server_timing_header(self):
+        """Проверка заголовка Server-Timing у профилируемого запроса."""
+        with self.assertLogs('yatube.profiling', 'INFO'):
+            response = self.guest_client.get('/')
+        timing = response['Server-Timing']
+        for metric in ('sql;dur=', 'queries"', 'tpl;dur=', 'view;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_profiling_structured_log(self):
+        """Проверка структурированной строки лога."""
+        with self.assertLogs('yatube.profiling', 'INFO') as logs:
+            self.guest_client.get('/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], '/')
+        self.assertGreater(record['queries'], 0)
+        self.assertGreater(record['template_ms'], 0)
+        self.assertIn('posts_post', record['slowest_query'])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.0)
+    def test_profiling_sampling_disabled(self):
+        """Проверка, что вне выборки запрос не профилируется."""
+        response = self.guest_client.get('/')
+        self.assertFalse(response.has_header('Server-Timing'))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_profiling_does_not_patch_django(self):
+        """Проверка, что профилирование не подменяет методы Django."""
+        with self.assertLogs('yatube.profiling', 'INFO'):
+            self.guest_client.get('/')
+        self.assertEqual(
+            Template.render.__module__, 'django.template.backends.django'
+        )
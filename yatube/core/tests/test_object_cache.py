@@ -0,0 +1,134 @@
+from io import StringIO
+from unittest import mock
+
+from core import object_cache, routers
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import Http404
+from django.test import TestCase
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Тестовый автор')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        object_cache.stats(reset=True)
+        cache.clear()
+
+    def test_repeated_lookup_hits_cache(self):
+        """Проверка, что повторный поиск не обращается к базе."""
+        object_cache.get_object(User, username='Тестовый автор')
+        with self.assertNumQueries(0):
+            author = object_cache.get_object(User, username='Тестовый автор')
+        self.assertEqual(author, self.author)
+
+    def test_user_cached_without_private_fields(self):
+        """Проверка, что в кеш не попадают пароль и адрес пользователя."""
+        object_cache.get_object(User, username='Тестовый автор')
+        author = object_cache.get_object(User, pk=self.author.pk)
+        self.assertEqual(str(author), 'Тестовый автор')
+        for field in ('password', 'email', 'last_login'):
+            with self.subTest(field=field):
+                self.assertNotIn(field, author.__dict__)
+
+    def test_hits_do_not_write_to_cache(self):
+        """Проверка, что попадания не пишут счётчики в общий кеш."""
+        object_cache.get_object(Post, pk=self.post.pk)
+        with mock.patch.object(cache, 'incr') as incr:
+            for _ in range(10):
+                object_cache.get_object(Post, pk=self.post.pk)
+        incr.assert_not_called()
+        self.assertEqual(object_cache.stats()['posts.post']['hit'], 10)
+
+    def test_related_objects_come_from_cache(self):
+        """Проверка, что автор и группа поста подставляются из кеша."""
+        object_cache.get_object_or_404(
+            Post, related=('author', 'group'), pk=self.post.pk
+        )
+        with self.assertNumQueries(0):
+            post = object_cache.get_object_or_404(
+                Post, related=('author', 'group'), pk=str(self.post.pk)
+            )
+            self.assertEqual(post.author.username, 'Тестовый автор')
+            self.assertEqual(post.group.slug, 'test-slug')
+
+    def test_filled_from_primary(self):
+        """Проверка, что кеш не заполняется с реплики."""
+        with mock.patch.object(
+            routers._state, 'read_alias', 'replica', create=True
+        ):
+            post = object_cache.get_object(Post, pk=self.post.pk)
+        self.assertEqual(post, self.post)
+
+    def test_missing_object_is_cached(self):
+        """Проверка, что 404 тоже кешируется."""
+        with self.assertRaises(Http404):
+            object_cache.get_object_or_404(Group, slug='missing')
+        with self.assertNumQueries(0), self.assertRaises(Http404):
+            object_cache.get_object_or_404(Group, slug='missing')
+
+    def test_created_object_replaces_missing_entry(self):
+        """Проверка, что создание объекта сбрасывает закешированный 404."""
+        self.assertIsNone(object_cache.get_object(Group, slug='new-slug'))
+        Group.objects.create(title='Новая', slug='new-slug')
+        group = object_cache.get_object(Group, slug='new-slug')
+        self.assertEqual(group.title, 'Новая')
+
+    def test_save_invalidates_entries(self):
+        """Проверка, что изменение и переименование сбрасывают записи."""
+        object_cache.get_object(Group, slug='test-slug')
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed'
+        group.save()
+        self.assertIsNone(object_cache.get_object(Group, slug='test-slug'))
+        self.assertEqual(
+            object_cache.get_object(Group, pk=self.group.pk).slug, 'renamed'
+        )
+
+    def test_delete_invalidates_entries(self):
+        """Проверка, что удалённый пост больше не отдаётся из кеша."""
+        post = Post.objects.create(text='Удаляемый', author=self.author)
+        object_cache.get_object(Post, pk=post.pk)
+        post.delete()
+        self.assertIsNone(object_cache.get_object(Post, pk=post.pk))
+
+    def test_bump_version_drops_missing_entries(self):
+        """Проверка, что смена версии сбрасывает записи без сигналов."""
+        self.assertIsNone(object_cache.get_object(Group, slug='bulk'))
+        Group.objects.bulk_create([Group(title='Массовая', slug='bulk')])
+        self.assertIsNone(object_cache.get_object(Group, slug='bulk'))
+        object_cache.bump_version()
+        self.assertIsNotNone(object_cache.get_object(Group, slug='bulk'))
+
+    def test_unregistered_lookup_rejected(self):
+        """Проверка, что поиск по некешируемому полю запрещён."""
+        with self.assertRaises(ValueError):
+            object_cache.get_object(Group, title='Тестовая группа')
+
+    def test_stats_command(self):
+        """Проверка счётчиков попаданий и промахов."""
+        object_cache.get_object(Post, pk=self.post.pk)
+        object_cache.get_object(Post, pk=self.post.pk)
+        object_cache.get_object(Post, pk=0)
+        object_cache.get_object(Post, pk=0)
+        out = StringIO()
+        call_command('object_cache_stats', '--reset', stdout=out)
+        self.assertIn('"hit": 1', out.getvalue())
+        self.assertIn('"miss": 2', out.getvalue())
+        self.assertIn('"missing_hit": 1', out.getvalue())
+        self.assertEqual(object_cache.stats()['posts.post']['miss'], 0)
@@ -0,0 +1,135 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from core.routers import (PIN_SESSION_KEY, _state, choose_replica,
+                          replica_lag, sync_marker)
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post, UserStats
+
+User = get_user_model()
+
+#   в тестах реплика — та же база под видом реплики
+TEST_REPLICAS = ['default']
+
+
+@override_settings(DATABASE_REPLICAS=TEST_REPLICAS, REPLICA_MAX_LAG=5)
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        patcher = mock.patch('core.routers.replica_lag', return_value=0.5)
+        self.lag = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read_database(self, url):
+        response = self.author_client.get(url)
+        return response.wsgi_request.read_database
+
+    def test_router_reads_allowlisted_views_from_replica(self):
+        """Проверка, что с реплики читают только разрешённые страницы."""
+        self.assertEqual(self.read_database(reverse('posts:index')), 'default')
+        self.assertEqual(self.read_database(reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )), 'default')
+        self.assertIsNone(self.read_database(reverse('posts:post_create')))
+        self.assertIsNone(self.read_database(reverse('posts:search')))
+
+    def test_router_pins_session_after_write(self):
+        """Проверка чтения своих записей из основной базы."""
+        self.author_client.post(
+            reverse('posts:post_comment', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Комментарий'},
+        )
+        self.assertIsNone(self.read_database(reverse('posts:index')))
+        other_client = Client()
+        response = other_client.get(reverse('posts:index'))
+        self.assertEqual(response.wsgi_request.read_database, 'default')
+
+    def test_router_no_session_for_anonymous_writes(self):
+        """Проверка, что побочная запись не создаёт сессию анониму."""
+        reader = User.objects.create_user(username='reader')
+        url = reverse('posts:profile', kwargs={'username': reader.username})
+        for replicas in (TEST_REPLICAS, []):
+            with self.subTest(replicas=replicas), override_settings(
+                DATABASE_REPLICAS=replicas
+            ):
+                UserStats.objects.filter(user=reader).delete()
+                cache.clear()
+                sessions = Session.objects.count()
+                response = Client().get(url)
+                self.assertTrue(UserStats.objects.filter(user=reader).exists())
+                self.assertNotIn(
+                    settings.SESSION_COOKIE_NAME, response.cookies
+                )
+                self.assertEqual(Session.objects.count(), sessions)
+
+    def test_router_no_pin_without_replicas(self):
+        """Проверка, что без реплик сессия не закрепляется."""
+        with override_settings(DATABASE_REPLICAS=[]):
+            response = self.author_client.post(reverse(
+                'posts:post_comment', kwargs={'post_id': self.post.pk}
+            ), data={'text': 'Комментарий'})
+        self.assertNotIn(PIN_SESSION_KEY, response.wsgi_request.session)
+
+    def test_router_recount_reads_primary(self):
+        """Проверка, что пересчёт счётчиков читает основную базу."""
+        _state.read_alias = 'replica'
+        self.addCleanup(setattr, _state, 'read_alias', None)
+        stats = UserStats.objects.recount(self.author.pk)
+        self.assertEqual(stats.post_count, 1)
+
+    def test_router_skips_lagging_replica(self):
+        """Проверка, что отстающая реплика не используется."""
+        self.lag.return_value = 30
+        self.assertIsNone(self.read_database(reverse('posts:index')))
+        self.lag.return_value = None
+        self.assertIsNone(self.read_database(reverse('posts:index')))
+
+    def test_router_chooses_only_healthy_replicas(self):
+        """Проверка выбора реплики по отставанию."""
+        lags = {'fresh': 1, 'stale': 60, 'unknown': None}
+        self.lag.side_effect = lags.get
+        with override_settings(DATABASE_REPLICAS=list(lags)):
+            for _ in range(10):
+                self.assertEqual(choose_replica(), 'fresh')
+
+
+class SyncReplicaCommandTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.replica = {
+            **settings.DATABASES['default'],
+            'NAME': os.path.join(self.directory, 'replica.sqlite3'),
+        }
+
+    def test_sync_replica_copies_database(self):
+        """Проверка копии базы и отметки времени синхронизации."""
+        with mock.patch.dict(settings.DATABASES, replica=self.replica):
+            call_command(
+                'sync_replica', database=['replica'], stdout=StringIO()
+            )
+            self.assertTrue(os.path.exists(sync_marker('replica')))
+            self.assertLess(replica_lag('replica'), 5)
+        replica = sqlite3.connect(self.replica['NAME'])
+        self.addCleanup(replica.close)
+        tables = {row[0] for row in replica.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )}
+        self.assertIn('posts_post', tables)
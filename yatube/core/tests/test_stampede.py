@@ -0,0 +1,132 @@
+import threading
+import time
+from unittest import mock
+
+from core import stampede
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+
+
+class Counter:
+    """Вычисление, которое запоминает число вызовов."""
+
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f'value {self.calls}'
+
+
+@override_settings(CACHE_STAMPEDE_GRACE=60, CACHE_STAMPEDE_WAIT=2)
+class StampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def expire(self, key):
+        """Переводит запись в состояние «истекла, но ещё хранится»."""
+        entry_key = stampede.ENTRY_KEY.format(key=key)
+        value, _, delta = cache.get(entry_key)
+        cache.set(entry_key, (value, time.time() - 1, delta), 60)
+
+    def test_value_cached(self):
+        """Проверка, что свежее значение не пересчитывается."""
+        compute = Counter()
+        for _ in range(3):
+            self.assertEqual(stampede.fetch('key', compute, 20), 'value 1')
+        self.assertEqual(compute.calls, 1)
+
+    def test_zero_timeout_disables_cache(self):
+        """Проверка, что нулевой срок отключает кеш, как в {% cache %}."""
+        compute = Counter()
+        stampede.fetch('key', compute, 0)
+        stampede.fetch('key', compute, 0)
+        self.assertEqual(compute.calls, 2)
+
+    def test_expired_value_recomputed(self):
+        """Проверка пересчёта истёкшего значения."""
+        compute = Counter()
+        stampede.fetch('key', compute, 20)
+        self.expire('key')
+        self.assertEqual(stampede.fetch('key', compute, 20), 'value 2')
+
+    def test_stale_value_served_while_locked(self):
+        """Проверка, что пока другой процесс считает, отдаётся старое."""
+        compute = Counter()
+        stampede.fetch('key', compute, 20)
+        self.expire('key')
+        cache.add(stampede.LOCK_KEY.format(key='key'), True, 10)
+        self.assertEqual(stampede.fetch('key', compute, 20), 'value 1')
+        self.assertEqual(compute.calls, 1)
+
+    def test_outdated_value_recomputed_once(self):
+        """Проверка, что устаревшее по is_fresh значение считает один."""
+        compute = Counter()
+        stampede.fetch('key', compute, 20)
+        stampede.fetch('key', compute, 20, is_fresh=lambda value: False)
+        self.assertEqual(compute.calls, 2)
+        cache.add(stampede.LOCK_KEY.format(key='key'), True, 10)
+        self.assertEqual(
+            stampede.fetch('key', compute, 20, is_fresh=lambda value: False),
+            'value 2',
+        )
+        self.assertEqual(compute.calls, 2)
+
+    def test_probabilistic_early_recompute(self):
+        """Проверка XFetch: пересчёт до истечения зависит от случайности."""
+        compute = Counter()
+        stampede.fetch('key', compute, 20)
+        entry_key = stampede.ENTRY_KEY.format(key='key')
+        value, _, _ = cache.get(entry_key)
+        # Значение считалось 5 секунд, до истечения осталась секунда.
+        cache.set(entry_key, (value, time.time() + 1, 5.0), 60)
+        with mock.patch.object(stampede.random, 'random', return_value=1.0):
+            stampede.fetch('key', compute, 20)
+        self.assertEqual(compute.calls, 1)
+        with mock.patch.object(stampede.random, 'random', return_value=0.5):
+            stampede.fetch('key', compute, 20)
+        self.assertEqual(compute.calls, 2)
+
+    def test_single_flight_for_missing_value(self):
+        """Проверка, что новый ключ считает только один из запросов."""
+        compute = Counter(delay=0.3)
+        results = []
+
+        def worker():
+            results.append(stampede.fetch('key', compute, 20))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(compute.calls, 1)
+        self.assertEqual(results, ['value 1'] * 4)
+
+    def test_decorator(self):
+        """Проверка декоратора: ключ зависит от аргументов."""
+        calls = []
+
+        @stampede.cached(20)
+        def square(number):
+            calls.append(number)
+            return number * number
+
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(3), 9)
+        self.assertEqual(square(4), 16)
+        self.assertEqual(calls, [3, 4])
+
+    def test_template_tag(self):
+        """Проверка тега {% cache %} из библиотеки stampede."""
+        template = Template(
+            '{% load stampede %}'
+            '{% cache 20 fragment name %}{{ counter }}{% endcache %}'
+        )
+        first = template.render(Context({'name': 'a', 'counter': 1}))
+        second = template.render(Context({'name': 'a', 'counter': 2}))
+        other = template.render(Context({'name': 'b', 'counter': 3}))
+        self.assertEqual((first, second, other), ('1', '1', '3'))
@@ -1,8 +1,39 @@
 from django.contrib import admin
-from posts.models import Comment, Follow, Group, Post
+from django.http import StreamingHttpResponse
+from posts.export import export_filename, export_stream, spec_for_model
+from posts.models import Comment, Follow, Group, Post, UserStats
+from posts.search import filter_by_search
+
+CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+
+def export_action(file_format):
+    """Действие админки, отдающее выбранные объекты потоком."""
+    def export(modeladmin, request, queryset):
+        name, _ = spec_for_model(queryset.model)
+        response = StreamingHttpResponse(
+            export_stream(name, file_format, queryset=queryset),
+            content_type=CONTENT_TYPES[file_format],
+        )
+        filename = export_filename(name, file_format)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    export.__name__ = f'export_{file_format}'
+    export.short_description = f'Выгрузить выбранное в {file_format.upper()}'
+    export.allowed_permissions = ('view',)
+    return export
+
+
+export_jsonl = export_action('jsonl')
+export_csv = export_action('csv')
 
 
 class PostAdmin(admin.ModelAdmin):
+    actions = (export_jsonl, export_csv)
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_display_links = ('text', 'author')
     list_editable = ('group',)
@@ -10,8 +41,14 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
     search_fields = ('text',)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return filter_by_search(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
+    actions = (export_jsonl, export_csv)
     list_display = ('pk', 'title', 'slug', 'description')
     list_display_links = ('title',)
     list_editable = ('slug',)
@@ -19,6 +56,7 @@ class GroupAdmin(admin.ModelAdmin):
 
 
 class CommentAdmin(admin.ModelAdmin):
+    actions = (export_jsonl, export_csv)
     list_display = ('pk', 'text', 'author', 'post', 'created')
     list_editable = ('text',)
     list_display_links = ('pk',)
@@ -26,10 +64,17 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 class FollowAdmin(admin.ModelAdmin):
+    actions = (export_jsonl, export_csv)
     list_display = ('pk', 'user', 'author',)
 
 
+class UserStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'post_count', 'follower_count', 'following_count')
+    readonly_fields = ('post_count', 'follower_count', 'following_count')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(UserStats, UserStatsAdmin)
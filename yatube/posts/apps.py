@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(sender, using, **kwargs):
+    from posts import search
+
+    search.install_search_index(connections[using])
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
     verbose_name = 'Статьи'
+
+    def ready(self):
+        from posts import signals  # noqa: F401
+
+        post_migrate.connect(restore_search_index, sender=self)
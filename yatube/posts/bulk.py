@@ -0,0 +1,71 @@
+"""
+Общие части массовой загрузки данных (импорт, генерация тестовых данных).
+
+``bulk_create`` не посылает сигналов, поэтому счётчики, ленты подписок и
+поколения лент после загрузки пересобираются явно.
+"""
+from contextlib import contextmanager
+from itertools import islice
+
+from core import object_cache
+from django.db import transaction
+from posts import timeline
+from posts.feed_cache import (author_scope, bump_feed_generation, group_scope,
+                              index_scope, stats_scope)
+from posts.stats import recount_chunk
+
+CHUNK_SIZE = 1000
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@contextmanager
+def original_dates(*fields):
+    """
+    Снимает ``auto_now_add`` с полей ``fields`` на время загрузки.
+
+    Иначе ``bulk_create`` заменит исходные даты текущим временем.
+    """
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def rebuild_derived(author_ids, group_ids=(), user_ids=(), since_pk=0):
+    """
+    Пересчитывает то, что обычно обновляют сигналы.
+
+    Счётчики — для авторов ``author_ids`` и пользователей ``user_ids``.
+    Посты ``author_ids`` с ``pk`` больше ``since_pk`` раскладываются по
+    лентам подписчиков, а ленты ``user_ids``, чьи подписки загружены
+    в обход сигналов, пересобираются целиком. Кеш объектов устаревает
+    целиком.
+    """
+    stats_ids = sorted(set(author_ids) | set(user_ids))
+    for chunk in chunked(stats_ids, CHUNK_SIZE):
+        with transaction.atomic():
+            recount_chunk(chunk)
+    for chunk in chunked(sorted(set(author_ids)), CHUNK_SIZE):
+        with transaction.atomic():
+            timeline.fan_out_since(chunk, since_pk, user_ids)
+    for chunk in chunked(sorted(set(user_ids)), CHUNK_SIZE):
+        with transaction.atomic():
+            timeline.rebuild(chunk)
+    object_cache.bump_version()
+    bump_feed_generation(
+        index_scope(),
+        *(author_scope(pk) for pk in author_ids),
+        *(group_scope(pk) for pk in group_ids),
+        *(stats_scope(pk) for pk in stats_ids),
+    )
@@ -0,0 +1,203 @@
+"""
+Валидаторы условных GET-запросов (ETag и Last-Modified).
+
+Вычисляются до выборки страницы и рендера по дешёвым агрегатам:
+поколениям областей ``feed_cache``, содержимое которых попадает на
+страницу, последнему изменению постов и комментариев. В ETag входят
+пользователь и параметры запроса, так как от них зависит разметка
+страницы. Найденные объекты валидаторы
+оставляют на запросе (``shared``), чтобы представление не выбирало их
+повторно.
+"""
+import hashlib
+from datetime import datetime
+
+from core.object_cache import get_object
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.utils import timezone
+from django.views.decorators.http import condition
+from posts.feed_cache import (author_scope, feed_generation,
+                              feed_generations, group_scope, index_scope,
+                              post_scope, stats_scope, user_scope)
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+def _from_ms(generation):
+    return datetime.fromtimestamp(generation / 1000, tz=timezone.utc)
+
+
+def _make_etag(*parts):
+    return hashlib.md5(
+        ':'.join(str(part) for part in parts).encode()
+    ).hexdigest()
+
+
+def _memoize(compute):
+    """
+    Кеширует валидаторы на объекте запроса.
+
+    Декоратор ``condition`` вызывает функции ETag и Last-Modified по
+    отдельности, а агрегаты для них общие.
+    """
+    def wrapper(request, *args, **kwargs):
+        cached = getattr(request, '_conditional_validators', None)
+        if cached is None:
+            cached = compute(request, *args, **kwargs)
+            request._conditional_validators = cached
+        return cached
+
+    return wrapper
+
+
+def shared(request, name, compute):
+    """
+    Значение ``name``, уже найденное для этого запроса, или ``compute()``.
+
+    Валидаторы и представление ищут одни и те же объекты (группу,
+    автора, счётчики); кто первым их выбрал, тот и сохраняет на запросе.
+    """
+    objects = request.__dict__.setdefault('_conditional_objects', {})
+    if name not in objects:
+        objects[name] = compute()
+    return objects[name]
+
+
+def _scope_validators(request, scopes, latest, *extra):
+    generations = feed_generations(scopes)
+    last_modified = max(filter(None, (
+        latest, *(_from_ms(value) for value in generations.values())
+    )))
+    etag = _make_etag(
+        *sorted(generations.items()), latest, request.user.pk,
+        request.GET.urlencode(), *extra,
+    )
+    return etag, last_modified
+
+
+def _feed_validators(request, scope, posts, *extra):
+    latest = posts.aggregate(latest=Max('updated'))['latest']
+    return _scope_validators(request, [scope], latest, *extra)
+
+
+@_memoize
+def index_validators(request):
+    return _feed_validators(request, index_scope(), Post.objects.all())
+
+
+@_memoize
+def group_validators(request, slug):
+    group = shared(request, 'group', lambda: get_object(Group, slug=slug))
+    if group is None:
+        return None, None
+    return _feed_validators(
+        request, group_scope(group.pk), Post.objects.filter(group=group.pk)
+    )
+
+
+@_memoize
+def profile_validators(request, username):
+    author = shared(
+        request, 'author', lambda: get_object(User, username=username)
+    )
+    if author is None:
+        return None, None
+    stats = shared(
+        request, 'stats', lambda: UserStats.objects.for_user(author)
+    )
+    following = shared(request, 'following', lambda: (
+        request.user.is_authenticated
+        and Follow.objects.filter(author=author, user=request.user).exists()
+    ))
+    # Адреса групп выводятся в ленте профиля: одним запросом берём и
+    # последнее изменение, и группы, в которых писал автор.
+    by_group = list(Post.objects.filter(author=author.pk).order_by().values(
+        'group_id'
+    ).annotate(latest=Max('updated')))
+    scopes = [
+        author_scope(author.pk), user_scope(author.pk), stats_scope(author.pk)
+    ]
+    scopes.extend(
+        group_scope(row['group_id']) for row in by_group if row['group_id']
+    )
+    latest = max((row['latest'] for row in by_group), default=None)
+    return _scope_validators(
+        request, scopes, latest,
+        stats.follower_count, stats.following_count, following,
+    )
+
+
+@_memoize
+def post_validators(request, post_id):
+    post = shared(request, 'post', lambda: get_object(Post, pk=post_id))
+    if post is None:
+        return None, None
+    # Удаление комментария последнее время не меняет, его отмечает
+    # поколение поста; имена комментаторов — их поколения.
+    by_author = list(Comment.objects.filter(post=post_id).order_by().values(
+        'author_id'
+    ).annotate(latest=Max('created')))
+    scopes = [
+        post_scope(post_id),
+        author_scope(post.author_id),
+        user_scope(post.author_id),
+    ]
+    if post.group_id:
+        scopes.append(group_scope(post.group_id))
+    scopes.extend(user_scope(row['author_id']) for row in by_author)
+    latest_comment = max(
+        (row['latest'] for row in by_author), default=None
+    )
+    latest = max(filter(None, (post.updated, latest_comment)))
+    return _scope_validators(request, scopes, latest)
+
+
+def _syndication_validators(request, scope, latest):
+    generation = feed_generation(scope)
+    last_modified = max(filter(None, (latest, _from_ms(generation))))
+    etag = _make_etag(
+        request.get_host(), request.path, scope, generation, latest
+    )
+    return etag, last_modified
+
+
+@_memoize
+def index_feed_validators(request):
+    latest = Post.objects.aggregate(latest=Max('pub_date'))['latest']
+    return _syndication_validators(request, index_scope(), latest)
+
+
+@_memoize
+def group_feed_validators(request, slug):
+    group = Group.objects.filter(slug=slug).annotate(
+        latest=Max('posts__pub_date')
+    ).values_list('pk', 'latest').first()
+    if group is None:
+        return None, None
+    group_id, latest = group
+    return _syndication_validators(request, group_scope(group_id), latest)
+
+
+@_memoize
+def profile_feed_validators(request, username):
+    author = User.objects.filter(username=username).annotate(
+        latest=Max('posts__pub_date')
+    ).values_list('pk', 'latest').first()
+    if author is None:
+        return None, None
+    author_id, latest = author
+    return _syndication_validators(request, author_scope(author_id), latest)
+
+
+def conditional(validators):
+    """Декоратор ``condition`` с валидаторами из ``validators``."""
+    return condition(
+        etag_func=lambda request, *args, **kwargs: (
+            validators(request, *args, **kwargs)[0]
+        ),
+        last_modified_func=lambda request, *args, **kwargs: (
+            validators(request, *args, **kwargs)[1]
+        ),
+    )
@@ -0,0 +1,150 @@
+"""
+Потоковая выгрузка постов, комментариев, подписок и групп.
+
+Строки читаются из базы ``iterator(chunk_size=...)`` и проходят цепочку
+генераторов (кодирование в JSONL/CSV, сжатие gzip), поэтому расход
+памяти не зависит от размера таблицы.
+"""
+import csv
+import json
+import zlib
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from posts.models import Comment, Follow, Group, Post
+
+FORMATS = ('jsonl', 'csv')
+
+ExportSpec = namedtuple('ExportSpec', ('model', 'date_field', 'columns'))
+
+#   колонки выгрузки: имя в файле и путь поля для values_list
+EXPORTS = {
+    'posts': ExportSpec(Post, 'pub_date', (
+        ('id', 'pk'),
+        ('text', 'text'),
+        ('pub_date', 'pub_date'),
+        ('updated', 'updated'),
+        ('author', 'author__username'),
+        ('group', 'group__slug'),
+    )),
+    'comments': ExportSpec(Comment, 'created', (
+        ('id', 'pk'),
+        ('post', 'post_id'),
+        ('author', 'author__username'),
+        ('text', 'text'),
+        ('created', 'created'),
+    )),
+    'follows': ExportSpec(Follow, None, (
+        ('id', 'pk'),
+        ('user', 'user__username'),
+        ('author', 'author__username'),
+    )),
+    'groups': ExportSpec(Group, None, (
+        ('id', 'pk'),
+        ('title', 'title'),
+        ('slug', 'slug'),
+        ('description', 'description'),
+    )),
+}
+
+
+def spec_for_model(model):
+    for name, spec in EXPORTS.items():
+        if spec.model is model:
+            return name, spec
+    raise LookupError(f'Выгрузка {model.__name__} не поддерживается.')
+
+
+def parse_bound(value, end=False):
+    """
+    Граница периода из даты или даты со временем.
+
+    Дата без времени включается целиком: для верхней границы берётся
+    начало следующего дня.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value}')
+        if end:
+            day += timedelta(days=1)
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(name, queryset=None, since=None, until=None,
+                chunk_size=2000):
+    """Кортежи значений колонок выгрузки ``name`` в порядке ``pk``."""
+    spec = EXPORTS[name]
+    if queryset is None:
+        queryset = spec.model.objects.all()
+    if spec.date_field:
+        if since is not None:
+            queryset = queryset.filter(**{f'{spec.date_field}__gte': since})
+        if until is not None:
+            queryset = queryset.filter(**{f'{spec.date_field}__lt': until})
+    elif since is not None or until is not None:
+        raise ValueError(f'Для выгрузки {name} нет поля даты.')
+    lookups = [lookup for _, lookup in spec.columns]
+    return queryset.order_by('pk').values_list(*lookups).iterator(
+        chunk_size=chunk_size
+    )
+
+
+def encode_jsonl(header, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(header, row)), cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+class _Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in row
+        )
+
+
+def encode_gzip(chunks, level=6):
+    """Сжимает поток строк в формат gzip по частям."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(name, file_format='jsonl', compress=False, **filters):
+    """Генератор байтов выгрузки ``name`` в формате ``file_format``."""
+    spec = EXPORTS[name]
+    header = [column for column, _ in spec.columns]
+    rows = export_rows(name, **filters)
+    encode = encode_csv if file_format == 'csv' else encode_jsonl
+    chunks = encode(header, rows)
+    if compress:
+        return encode_gzip(chunks)
+    return (chunk.encode() for chunk in chunks)
+
+
+def export_filename(name, file_format, compress=False):
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S')
+    suffix = '.gz' if compress else ''
+    return f'{name}-{stamp}.{file_format}{suffix}'
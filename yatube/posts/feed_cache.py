@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'feed_generation:{scope}'
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scope(post_id):
+    return f'post:{post_id}'
+
+
+def stats_scope(user_id):
+    """Счётчики подписок пользователя (выводятся только в профиле)."""
+    return f'stats:{user_id}'
+
+
+def user_scope(user_id):
+    """Имя пользователя на чужих страницах (меняется при переименовании)."""
+    return f'user:{user_id}'
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def feed_generation(scope):
+    """
+    Возвращает текущее поколение ленты ``scope``.
+
+    Поколение — время последнего изменения ленты в миллисекундах (или
+    на единицу больше предыдущего поколения). Начальное значение тоже
+    берётся от времени, чтобы после вытеснения ключа из кеша поколение
+    не совпало с уже закешированными фрагментами.
+    """
+    key = GENERATION_KEY.format(scope=scope)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _now_ms(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def feed_generations(scopes):
+    """Поколения нескольких областей одним запросом к кешу."""
+    keys = {GENERATION_KEY.format(scope=scope): scope for scope in scopes}
+    found = cache.get_many(keys)
+    generations = {keys[key]: value for key, value in found.items()}
+    for scope in set(scopes) - set(generations):
+        generations[scope] = feed_generation(scope)
+    return generations
+
+
+def bump_feed_generation(*scopes):
+    for scope in scopes:
+        key = GENERATION_KEY.format(scope=scope)
+        generation = cache.get(key)
+        if generation is None:
+            cache.add(key, _now_ms(), None)
+        else:
+            cache.set(key, max(generation + 1, _now_ms()), None)
+
+
+def post_version(post):
+    """
+    Версия разметки поста в ленте.
+
+    Собрана из всего, что попадает в разметку помимо самого поста:
+    ``updated`` меняется при правке, смене группы и готовности миниатюр,
+    имя автора и адрес группы — при переименовании.
+    """
+    group_slug = post.group.slug if post.group_id else ''
+    raw = f'{post.updated.isoformat()}|{post.author.username}|{group_slug}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def feed_page_key(page_obj):
+    """
+    Ключ страницы ленты по её содержимому.
+
+    В ключ входят версии постов, поэтому правка или переименование
+    автора и группы меняют его и без нового поколения ленты. Строка
+    запроса в ключ не попадает: любые лишние или испорченные параметры,
+    которые приводят к той же странице, дают тот же ключ.
+    """
+    items = ','.join(f'{post.pk}.{post_version(post)}' for post in page_obj)
+    return (
+        f'{page_obj.number}:{items}:'
+        f'{page_obj.has_previous():d}{page_obj.has_next():d}'
+    )
+
+
+def feed_cache_context(page_obj, scope):
+    """Контекст для тега ``{% cache %}`` вокруг ленты постов."""
+    return {
+        'feed_cache_timeout': settings.FEED_CACHE_TIMEOUT,
+        'feed_generation': feed_generation(scope),
+        'feed_page_key': feed_page_key(page_obj),
+    }
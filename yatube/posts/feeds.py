@@ -0,0 +1,145 @@
+from core import stampede
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.text import Truncator
+from posts.conditional import (conditional, group_feed_validators,
+                               index_feed_validators, profile_feed_validators)
+from posts.models import Group, Post
+
+User = get_user_model()
+
+FEED_KEY = 'syndication:{etag}'
+
+
+class LatestPostsFeed(Feed):
+    title = 'Последние обновления на сайте Yatube'
+    description = 'Новые посты всех авторов.'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def items(self):
+        return Post.objects.select_related('author', 'group')[
+            :settings.SYNDICATION_ITEMS
+        ]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(8)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return (item.group.title,) if item.group else ()
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return group.title
+
+    def description(self, group):
+        return group.description
+
+    def link(self, group):
+        return reverse('posts:group_list', kwargs={'slug': group.slug})
+
+    def items(self, group):
+        return group.posts.select_related('author', 'group')[
+            :settings.SYNDICATION_ITEMS
+        ]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Посты пользователя {author.username}'
+
+    def description(self, author):
+        return f'Новые посты пользователя {author.username}.'
+
+    def link(self, author):
+        return reverse(
+            'posts:profile', kwargs={'username': author.username}
+        )
+
+    def items(self, author):
+        return author.posts.select_related('author', 'group')[
+            :settings.SYNDICATION_ITEMS
+        ]
+
+
+class AtomLatestPostsFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class AtomGroupPostsFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, group):
+        return self.description(group)
+
+
+class AtomAuthorPostsFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
+
+
+def cached_feed(feed, validators):
+    """
+    Представление ленты с условным GET и кешем готового XML.
+
+    Ключ кеша — ETag ленты, то есть он меняется вместе с самым новым
+    ``pub_date`` и поколением ленты, и опрос без изменений обходится
+    одним индексным запросом.
+    """
+    @conditional(validators)
+    def view(request, *args, **kwargs):
+        etag, _ = validators(request, *args, **kwargs)
+        if etag is None:
+            return feed(request, *args, **kwargs)
+
+        def render():
+            response = feed(request, *args, **kwargs)
+            return response.content, response['Content-Type']
+
+        content, content_type = stampede.fetch(
+            FEED_KEY.format(etag=etag),
+            render,
+            settings.SYNDICATION_CACHE_TIMEOUT,
+        )
+        return HttpResponse(content, content_type=content_type)
+
+    return view
+
+
+index_rss = cached_feed(LatestPostsFeed(), index_feed_validators)
+index_atom = cached_feed(AtomLatestPostsFeed(), index_feed_validators)
+group_rss = cached_feed(GroupPostsFeed(), group_feed_validators)
+group_atom = cached_feed(AtomGroupPostsFeed(), group_feed_validators)
+profile_rss = cached_feed(AuthorPostsFeed(), profile_feed_validators)
+profile_atom = cached_feed(AtomAuthorPostsFeed(), profile_feed_validators)
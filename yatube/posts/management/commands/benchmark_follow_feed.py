@@ -0,0 +1,73 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+from posts.models import Post, TimelineEntry
+
+User = get_user_model()
+
+
+def join_feed(user_id, per_page):
+    return list(
+        Post.objects.filter(author__following__user_id=user_id)
+        .order_by('-pub_date', '-pk')[:per_page]
+    )
+
+
+def timeline_feed(user_id, per_page):
+    return [
+        entry.post for entry in
+        TimelineEntry.objects.filter(user_id=user_id)
+        .select_related('post')
+        .order_by('-pub_date', '-post_id')[:per_page]
+    ]
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время первой страницы ленты подписок: '
+            'соединение с Follow против материализованной ленты')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=20,
+            help='Сколько самых активных подписчиков замерять',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Повторов запроса на каждого пользователя',
+        )
+
+    def measure(self, feed, user_ids, repeat):
+        timings = []
+        for user_id in user_ids:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                feed(user_id, settings.POSTS_PER_PAGE)
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def handle(self, *args, **options):
+        user_ids = list(
+            User.objects.annotate(following_total=Count('follower'))
+            .filter(following_total__gt=0)
+            .order_by('-following_total')
+            .values_list('pk', flat=True)[:options['users']]
+        )
+        if not user_ids:
+            self.stdout.write('Нет пользователей с подписками.')
+            return
+        for name, feed in (('join', join_feed), ('timeline', timeline_feed)):
+            timings = self.measure(feed, user_ids, options['repeat'])
+            self.stdout.write(
+                f'{name:>8}: среднее {statistics.mean(timings):.2f} мс, '
+                f'медиана {statistics.median(timings):.2f} мс, '
+                f'максимум {max(timings):.2f} мс '
+                f'({len(timings)} запросов)'
+            )
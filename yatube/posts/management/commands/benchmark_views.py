@@ -0,0 +1,144 @@
+import json
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts import urls as posts_urls
+from posts.models import Group, Post
+
+User = get_user_model()
+
+#   представления, которые меняют данные даже на GET
+SKIPPED_VIEWS = ('profile_follow', 'profile_unfollow', 'post_comment')
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(round(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку и число SQL-запросов всех страниц posts.urls '
+        'через тестовый клиент и выводит результат в JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Количество запросов к каждой странице',
+        )
+        parser.add_argument(
+            '--cold',
+            action='store_true',
+            help='Очищать кеш перед каждым запросом',
+        )
+        parser.add_argument(
+            '--output', help='Файл для JSON, по умолчанию стандартный вывод',
+        )
+
+    def sample_kwargs(self):
+        """Значения параметров URL: самые нагруженные автор, группа и пост."""
+        author = (
+            User.objects.annotate(total=Count('posts'))
+            .filter(total__gt=0).order_by('-total').first()
+        )
+        group = (
+            Group.objects.annotate(total=Count('posts'))
+            .order_by('-total').first()
+        )
+        if author is None or group is None:
+            raise CommandError(
+                'Нет постов или групп: сначала выполните seed_scale.'
+            )
+        post = (
+            Post.objects.filter(author=author)
+            .annotate(total=Count('comments'))
+            .order_by('-total').first()
+        )
+        return author, {
+            'username': author.username,
+            'slug': group.slug,
+            'post_id': post.pk,
+        }
+
+    def measure(self, client, url, repeat, cold):
+        timings, queries, status = [], [], None
+        # Двухъярусный кеш считает попадания по ярусам в процессе.
+        tier_stats = getattr(cache, 'tier_stats', None)
+        if tier_stats:
+            tier_stats(reset=True)
+        for _ in range(repeat):
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured.captured_queries))
+            status = response.status_code
+        return {
+            'url': url,
+            'status': status,
+            'requests': repeat,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'mean_ms': round(sum(timings) / len(timings), 2),
+            'queries': max(queries),
+            'cache': tier_stats() if tier_stats else None,
+        }
+
+    def handle(self, *args, **options):
+        author, sample = self.sample_kwargs()
+        client = Client()
+        client.force_login(author)
+        results = {}
+        # Профилирование отключено, чтобы не искажать замеры.
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            PROFILING_SAMPLE_RATE=0,
+        ):
+            for pattern in posts_urls.urlpatterns:
+                if pattern.name in SKIPPED_VIEWS:
+                    continue
+                kwargs = {
+                    name: sample[name] for name in pattern.pattern.converters
+                }
+                url = reverse(
+                    f'{posts_urls.app_name}:{pattern.name}', kwargs=kwargs
+                )
+                results[pattern.name] = self.measure(
+                    client, url, options['repeat'], options['cold']
+                )
+        report = json.dumps({
+            'created': timezone.now().isoformat(),
+            'repeat': options['repeat'],
+            'cold_cache': options['cold'],
+            'rows': {
+                'users': User.objects.count(),
+                'posts': Post.objects.count(),
+                'groups': Group.objects.count(),
+            },
+            'views': results,
+        }, ensure_ascii=False, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                file.write(report)
+            self.stderr.write(f'Результат записан в {options["output"]}')
+        else:
+            self.stdout.write(report)
@@ -0,0 +1,66 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from posts.export import EXPORTS, FORMATS, export_stream, parse_bound
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты, комментарии, подписки или группы'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=tuple(EXPORTS))
+        parser.add_argument(
+            '--format', choices=FORMATS, default='jsonl',
+            help='Формат выгрузки',
+        )
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать выгрузку gzip',
+        )
+        parser.add_argument(
+            '--since', help='Начало периода (дата или дата и время)',
+        )
+        parser.add_argument(
+            '--until', help='Конец периода включительно для дат',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество строк, читаемых из базы за раз',
+        )
+        parser.add_argument(
+            '--output', default='-',
+            help='Файл выгрузки, «-» — стандартный вывод',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            chunks = export_stream(
+                options['name'],
+                file_format=options['format'],
+                compress=options['gzip'],
+                since=(options['since']
+                       and parse_bound(options['since'])),
+                until=(options['until']
+                       and parse_bound(options['until'], end=True)),
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+        output = options['output']
+        if output == '-':
+            target = sys.stdout.buffer
+            self.write_chunks(target, chunks)
+            target.flush()
+            return
+        with open(output, 'wb') as target:
+            size = self.write_chunks(target, chunks)
+        self.stdout.write(self.style.SUCCESS(
+            f'Выгрузка {options["name"]} записана в {output} ({size} байт)'
+        ))
+
+    @staticmethod
+    def write_chunks(target, chunks):
+        size = 0
+        for chunk in chunks:
+            target.write(chunk)
+            size += len(chunk)
+        return size
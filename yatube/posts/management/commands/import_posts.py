@@ -0,0 +1,203 @@
+import csv
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from posts.bulk import chunked, original_dates, rebuild_derived
+from posts.models import Group, Post
+from posts.search import insert_trigger_suspended
+
+User = get_user_model()
+
+FORMATS = ('jsonl', 'csv')
+
+
+def read_rows(stream, file_format):
+    """Построчно читает записи, не загружая файл в память."""
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        # Битая строка пропускается вместе с прочими неполными записями.
+        yield row if isinstance(row, dict) else {}
+
+
+def parse_pub_date(value):
+    if not value:
+        return timezone.now()
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError(f'Неверная дата: {value}')
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+class Command(BaseCommand):
+    help = (
+        'Массово загружает посты из JSONL или CSV с полями text, author, '
+        'group и pub_date'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с постами, «-» — стандартный ввод',
+        )
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Формат файла, по умолчанию определяется по расширению',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество постов в одном bulk_create',
+        )
+        parser.add_argument(
+            '--batches-per-transaction',
+            type=int,
+            default=10,
+            help='Количество пачек в одной транзакции',
+        )
+        parser.add_argument(
+            '--create-missing',
+            action='store_true',
+            help='Создавать неизвестных авторов и группы вместо пропуска',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl'
+        )
+        self.verbosity = options['verbosity']
+        self.create_missing = options['create_missing']
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.author_ids = set()
+        self.group_ids = set()
+        # Ключи постов растут, всё новее этого раскладывается по лентам.
+        self.since_pk = Post.objects.aggregate(latest=Max('pk'))['latest'] or 0
+        self.imported = 0
+        self.skipped = 0
+
+        stream = (
+            sys.stdin if path == '-'
+            else open(path, newline='', encoding='utf-8')
+        )
+        started = time.perf_counter()
+        try:
+            rows = read_rows(stream, file_format)
+            transaction_size = (
+                options['batch_size'] * options['batches_per_transaction']
+            )
+            with insert_trigger_suspended(), original_dates(
+                Post._meta.get_field('pub_date')
+            ):
+                for chunk in chunked(rows, transaction_size):
+                    with transaction.atomic():
+                        for batch in chunked(chunk, options['batch_size']):
+                            self.import_batch(batch)
+                    self.report_progress(started)
+        except (OSError, csv.Error) as exc:
+            raise CommandError(f'Ошибка чтения {path}: {exc}')
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            load_time = time.perf_counter() - started
+            # Пачки, зафиксированные до ошибки, тоже должны попасть в
+            # счётчики и ленты подписок.
+            rebuild_derived(
+                self.author_ids, self.group_ids, since_pk=self.since_pk
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {self.imported}, пропущено: {self.skipped}, '
+            f'{self.imported / max(load_time, 1e-6):.0f} постов/с '
+            f'(загрузка {load_time:.1f} с, всего '
+            f'{time.perf_counter() - started:.1f} с)'
+        ))
+
+    def report_progress(self, started):
+        if self.verbosity < 1:
+            return
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Загружено {self.imported} постов, '
+            f'{self.imported / max(elapsed, 1e-6):.0f} постов/с'
+        )
+
+    def create_authors(self, usernames):
+        User.objects.bulk_create(
+            [User(username=name, password=make_password(None))
+             for name in usernames],
+            ignore_conflicts=True,
+        )
+        self.authors.update(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'pk')
+        )
+
+    def create_groups(self, slugs):
+        Group.objects.bulk_create(
+            [Group(slug=slug, title=slug, description='') for slug in slugs],
+            ignore_conflicts=True,
+        )
+        self.groups.update(
+            Group.objects.filter(slug__in=slugs).values_list('slug', 'pk')
+        )
+
+    def import_batch(self, rows):
+        if self.create_missing:
+            usernames = {row.get('author') for row in rows} - set(
+                self.authors
+            )
+            slugs = {row.get('group') for row in rows} - set(self.groups)
+            usernames.discard(None)
+            usernames.discard('')
+            slugs.discard(None)
+            slugs.discard('')
+            if usernames:
+                self.create_authors(usernames)
+            if slugs:
+                self.create_groups(slugs)
+
+        posts = []
+        for row in rows:
+            author_id = self.authors.get(row.get('author'))
+            group_slug = row.get('group') or None
+            group_id = self.groups.get(group_slug)
+            if (not row.get('text') or author_id is None
+                    or (group_slug and group_id is None)):
+                self.skipped += 1
+                continue
+            try:
+                pub_date = parse_pub_date(row.get('pub_date'))
+            except ValueError:
+                self.skipped += 1
+                continue
+            posts.append(Post(
+                text=row['text'],
+                author_id=author_id,
+                group_id=group_id,
+                pub_date=pub_date,
+            ))
+            self.author_ids.add(author_id)
+            if group_id:
+                self.group_ids.add(group_id)
+        Post.objects.bulk_create(posts)
+        self.imported += len(posts)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Создаёт недостающие миниатюры для всех картинок постов'
+
+    def handle(self, *args, **options):
+        names = (
+            Post.objects.exclude(image='')
+            .order_by('pk')
+            .values_list('image', flat=True)
+        )
+        total = 0
+        for name in names.iterator():
+            generate_thumbnails(name)
+            total += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {total}'
+        ))
@@ -0,0 +1,216 @@
+import random
+import time
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from posts.bulk import CHUNK_SIZE, chunked, original_dates, rebuild_derived
+from posts.models import Comment, Follow, Group, Post
+from posts.search import insert_trigger_suspended
+
+User = get_user_model()
+
+WORDS = (
+    'город лето река дорога книга утро ветер море поезд история дом '
+    'друг работа кофе музыка кино зима лес гора письмо вечер праздник'
+).split()
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса степенного распределения по рангу объекта."""
+    return list(accumulate(
+        1 / (rank + 1) ** exponent for rank in range(count)
+    ))
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize() + '.'
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт пользователей, группы, посты, комментарии и подписки '
+        'со степенным распределением активности для нагрузочных замеров'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=50000)
+        parser.add_argument(
+            '--follows',
+            type=int,
+            default=20,
+            help='Среднее число подписок на пользователя',
+        )
+        parser.add_argument(
+            '--exponent',
+            type=float,
+            default=1.1,
+            help='Показатель степенного закона (больше — круче хвост)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='За сколько дней распределить даты публикаций',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='seed',
+            help='Префикс имён пользователей и адресов групп',
+        )
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.now = timezone.now()
+        self.days = options['days']
+        exponent = options['exponent']
+        started = time.perf_counter()
+
+        user_ids = self.create_users(options['users'])
+        group_ids = self.create_groups(options['groups'])
+        user_weights = zipf_weights(len(user_ids), exponent)
+        date_fields = (
+            Post._meta.get_field('pub_date'),
+            Comment._meta.get_field('created'),
+        )
+        try:
+            with insert_trigger_suspended(), original_dates(*date_fields):
+                post_ids = self.create_posts(
+                    options['posts'], user_ids, user_weights, group_ids,
+                    zipf_weights(len(group_ids), exponent),
+                )
+                comments = self.create_comments(
+                    options['comments'], user_ids, post_ids,
+                    zipf_weights(len(post_ids), exponent),
+                )
+            self.create_follows(options['follows'], user_ids, user_weights)
+        finally:
+            # Данные, созданные до ошибки, тоже должны попасть в счётчики
+            # и ленты подписок.
+            rebuild_derived(user_ids, group_ids, user_ids)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: пользователей {len(user_ids)}, групп {len(group_ids)}, '
+            f'постов {len(post_ids)}, комментариев {comments} '
+            f'за {time.perf_counter() - started:.1f} с'
+        ))
+
+    def random_date(self):
+        return self.now - timedelta(
+            seconds=self.rng.randrange(max(self.days, 1) * 24 * 60 * 60)
+        )
+
+    def create_users(self, count):
+        password = make_password(None)
+        names = [f'{self.prefix}_user_{number}' for number in range(count)]
+        for chunk in chunked(names, CHUNK_SIZE):
+            User.objects.bulk_create(
+                [User(username=name, password=password) for name in chunk],
+                ignore_conflicts=True,
+            )
+        # Ранг по порядку создания: первые пользователи самые активные.
+        ids = dict(User.objects.filter(
+            username__startswith=f'{self.prefix}_user_'
+        ).values_list('username', 'pk'))
+        return [ids[name] for name in names if name in ids]
+
+    def create_groups(self, count):
+        slugs = [f'{self.prefix}-group-{number}' for number in range(count)]
+        Group.objects.bulk_create(
+            [Group(title=f'Группа {number}', slug=slug,
+                   description=sentence(self.rng, 12))
+             for number, slug in enumerate(slugs)],
+            ignore_conflicts=True,
+        )
+        ids = dict(Group.objects.filter(slug__in=slugs).values_list(
+            'slug', 'pk'
+        ))
+        return [ids[slug] for slug in slugs]
+
+    def create_posts(self, count, user_ids, user_weights, group_ids,
+                     group_weights):
+        """Посты по авторам и группам с весами по степенному закону."""
+        last_pk = Post.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        for chunk in chunked(range(count), CHUNK_SIZE):
+            authors = self.rng.choices(
+                user_ids, cum_weights=user_weights, k=len(chunk)
+            )
+            posts = []
+            for author_id in authors:
+                group_id = None
+                if group_ids and self.rng.random() < 0.6:
+                    group_id = self.rng.choices(
+                        group_ids, cum_weights=group_weights
+                    )[0]
+                posts.append(Post(
+                    text=sentence(self.rng, self.rng.randint(5, 60)),
+                    author_id=author_id,
+                    group_id=group_id,
+                    pub_date=self.random_date(),
+                ))
+            with transaction.atomic():
+                Post.objects.bulk_create(posts)
+        return list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def create_comments(self, count, user_ids, post_ids, post_weights):
+        """Комментарии: немногие популярные посты собирают большинство."""
+        if not post_ids:
+            return 0
+        for chunk in chunked(range(count), CHUNK_SIZE):
+            targets = self.rng.choices(
+                post_ids, cum_weights=post_weights, k=len(chunk)
+            )
+            with transaction.atomic():
+                Comment.objects.bulk_create([
+                    Comment(
+                        post_id=post_id,
+                        author_id=self.rng.choice(user_ids),
+                        text=sentence(self.rng, self.rng.randint(3, 20)),
+                        created=self.random_date(),
+                    )
+                    for post_id in targets
+                ])
+        return count
+
+    def create_follows(self, average, user_ids, user_weights):
+        """
+        Граф подписок с предпочтительным присоединением.
+
+        Число подписок пользователя распределено экспоненциально со средним
+        ``average``, а авторы выбираются по популярности, так что у первых
+        авторов тысячи подписчиков, а у хвоста — единицы.
+        """
+        if len(user_ids) < 2:
+            return
+        follows = []
+        for user_id in user_ids:
+            wanted = min(
+                int(self.rng.expovariate(1 / max(average, 1))),
+                len(user_ids) - 1,
+            )
+            authors = set(self.rng.choices(
+                user_ids, cum_weights=user_weights, k=wanted
+            ))
+            authors.discard(user_id)
+            follows.extend(
+                Follow(user_id=user_id, author_id=author_id)
+                for author_id in authors
+            )
+            if len(follows) >= CHUNK_SIZE:
+                Follow.objects.bulk_create(follows, ignore_conflicts=True)
+                follows = []
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
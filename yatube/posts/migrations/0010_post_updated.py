@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Обновляется при каждом сохранении статьи', verbose_name='Дата изменения'),
+        ),
+    ]
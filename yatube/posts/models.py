@@ -1,5 +1,6 @@
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, router
+from django.db.models.functions import Greatest
 
 
 class Post(models.Model):
@@ -12,6 +13,12 @@ class Post(models.Model):
         verbose_name='Дата публикации',
         help_text='Укажите дату публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+        help_text='Обновляется при каждом сохранении статьи',
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -40,6 +47,20 @@ class Post(models.Model):
         verbose_name = 'Статья'
         verbose_name_plural = 'Статьи'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:15]
@@ -100,6 +121,12 @@ class Comment(models.Model):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('post', '-created', '-id'),
+                name='comment_post_created_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
@@ -131,6 +158,139 @@ class Follow(models.Model):
                 name='unique_follows',
             ),
         )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'),
+                name='follow_author_user_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return f'{self.user.username} подписан на {self.author.username}'
+
+
+class TimelineEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель ленты',
+        help_text='Подписчик, в ленту которого попал пост',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Статья',
+        help_text='Статья в ленте',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор статьи',
+        help_text='Нужен для очистки ленты при отписке',
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        help_text='Копия даты статьи для сортировки без соединения',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+        ordering = ('-pub_date', '-post')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry',
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date_idx',
+            ),
+            models.Index(
+                fields=('user', 'author'),
+                name='timeline_user_author_idx',
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.post_id} в ленте {self.user_id}'
+
+
+class UserStatsManager(models.Manager):
+    def recount(self, user_id):
+        # Счётчики пишутся в основную базу, и считать их надо там же:
+        # отстающая реплика сохранила бы устаревшие значения.
+        alias = router.db_for_write(self.model)
+        stats, _ = self.using(alias).update_or_create(
+            user_id=user_id,
+            defaults={
+                'post_count': Post.objects.using(alias).filter(
+                    author_id=user_id
+                ).count(),
+                'follower_count': Follow.objects.using(alias).filter(
+                    author_id=user_id
+                ).count(),
+                'following_count': Follow.objects.using(alias).filter(
+                    user_id=user_id
+                ).count(),
+            },
+        )
+        return stats
+
+    def for_user(self, user):
+        stats = self.filter(user=user).first()
+        if stats is None:
+            stats = self.recount(user.pk)
+        return stats
+
+    def change(self, user_id, **deltas):
+        """
+        Атомарно сдвигает счётчики пользователя на ``deltas``.
+
+        Отсутствующая запись создаётся пересчётом, но только при
+        увеличении: при каскадном удалении пользователя его запись уже
+        может быть удалена, и воскрешать её нельзя.
+        """
+        updated = self.filter(user_id=user_id).update(**{
+            field: Greatest(models.F(field) + delta, 0)
+            for field, delta in deltas.items()
+        })
+        if not updated and all(delta > 0 for delta in deltas.values()):
+            self.recount(user_id)
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name='stats',
+        verbose_name='Пользователь',
+        help_text='Владелец счётчиков',
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество статей',
+    )
+    follower_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков',
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок',
+    )
+
+    objects = UserStatsManager()
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self) -> str:
+        return f'Статистика {self.user_id}'
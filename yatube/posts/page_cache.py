@@ -0,0 +1,114 @@
+"""
+Кеш готовых страниц для анонимных посетителей.
+
+Запись помечается тегами — областями ``feed_cache`` (лента, группа,
+автор, пост, пользователь, счётчики), содержимое которых попало на
+страницу, — и хранит их поколения на момент рендера. Сигналы моделей
+поднимают поколения затронутых областей, после чего запись перестаёт
+совпадать с текущими поколениями и страница рендерится заново.
+
+Промах идёт через ``core.stampede.fetch``: рендерит один запрос, а
+остальные тем временем получают прежнюю страницу (``X-Page-Cache:
+stale``) или, если её ещё нет, ждут готовую.
+"""
+import hashlib
+from functools import wraps
+
+from core import stampede
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from posts.feed_cache import feed_generations
+
+PAGE_KEY = 'page_cache:{digest}'
+
+
+class _Uncacheable(Exception):
+    """Ответ, который нельзя кешировать: отдаётся как есть."""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+def _page_key(request):
+    url = request.build_absolute_uri()
+    return PAGE_KEY.format(digest=hashlib.md5(url.encode()).hexdigest())
+
+
+def tag_page(request, *scopes):
+    """
+    Помечает страницу областями ``scopes``.
+
+    Поколения читаются сразу, поэтому основную область представление
+    помечает до выборки данных: запись, пришедшая во время рендера,
+    тогда не будет потеряна.
+    """
+    tags = getattr(request, 'page_cache_tags', None)
+    if tags is None:
+        return
+    tags.update(feed_generations(
+        [scope for scope in scopes if scope not in tags]
+    ))
+
+
+def _cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+    )
+
+
+def _is_fresh(entry):
+    tags, _ = entry
+    return feed_generations(list(tags)) == tags
+
+
+def cache_anonymous_page(view):
+    """
+    Отдаёт анонимным посетителям готовую страницу из кеша.
+
+    Кешируются только ответы 200 без cookies, помеченные ``tag_page``;
+    авторизованные пользователи всегда получают свежий рендер.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view(request, *args, **kwargs)
+        rendered = []
+        fresh = []
+
+        def render():
+            request.page_cache_tags = {}
+            response = view(request, *args, **kwargs)
+            rendered.append(response)
+            if (response.status_code != 200
+                    or response.streaming
+                    or response.cookies
+                    or not request.page_cache_tags):
+                raise _Uncacheable(response)
+            return request.page_cache_tags, response
+
+        def is_fresh(entry):
+            fresh.append(_is_fresh(entry))
+            return fresh[-1]
+
+        try:
+            _, response = stampede.fetch(
+                _page_key(request), render, settings.PAGE_CACHE_TIMEOUT,
+                is_fresh=is_fresh,
+            )
+        except _Uncacheable as exc:
+            return exc.response
+        if rendered:
+            response['X-Page-Cache'] = 'miss'
+            return response
+        response['X-Page-Cache'] = 'hit' if all(fresh) else 'stale'
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(response.get('Last-Modified')),
+            response=response,
+        )
+
+    return wrapper
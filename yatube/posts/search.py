@@ -0,0 +1,159 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from posts.models import Post
+
+FTS_TABLE = 'posts_post_fts'
+
+INSTALL_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        text,
+        content='posts_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+class MatchingRowids(RawSQL):
+    """
+    Подзапрос с rowid совпадений FTS5 для ``pk__in``.
+
+    ``RawSQL`` оборачивает SQL в скобки, и внутри ``IN (...)`` SQLite
+    воспринимает это как скалярный подзапрос с одной первой строкой.
+    """
+
+    def __init__(self, match):
+        super().__init__(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [match],
+        )
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def is_available(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection):
+    """
+    Создаёт индекс FTS5 и триггеры синхронизации с ``posts_post``.
+
+    Операция идемпотентна: SQLite теряет триггеры при пересоздании
+    таблицы в миграциях, поэтому она повторяется после каждой миграции.
+    Индекс заполняется заново, только если таблица создана сейчас.
+    """
+    if not is_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [FTS_TABLE],
+        )
+        existed = cursor.fetchone() is not None
+        for statement in INSTALL_SQL:
+            cursor.execute(statement)
+    if not existed:
+        rebuild_search_index(using)
+
+
+def rebuild_search_index(using=connection):
+    if not is_available(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
+
+
+@contextmanager
+def insert_trigger_suspended(using=connection):
+    """
+    Отключает триггер вставки на время массовой загрузки постов.
+
+    Построчное обновление индекса заметно замедляет ``bulk_create``;
+    после загрузки триггер возвращается, а индекс пересобирается целиком.
+    """
+    if not is_available(using):
+        yield
+        return
+    with using.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_insert')
+    try:
+        yield
+    finally:
+        install_search_index(using)
+        rebuild_search_index(using)
+
+
+def build_match_query(text):
+    """
+    Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, чтобы операторы FTS5 во вводе не
+    интерпретировались, последнее слово ищется по префиксу.
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return ''
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_post_ids(text, limit, offset=0):
+    """Идентификаторы постов по убыванию релевантности (bm25)."""
+    match = build_match_query(text)
+    if not match:
+        return []
+    if not is_available():
+        return list(
+            Post.objects.filter(text__icontains=text)
+            .values_list('pk', flat=True)[offset:offset + limit]
+        )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            'ORDER BY rank LIMIT %s OFFSET %s',
+            [match, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def filter_by_search(queryset, text):
+    """Ограничивает ``queryset`` постами, найденными индексом."""
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not is_available():
+        return queryset.filter(text__icontains=text)
+    return queryset.filter(pk__in=MatchingRowids(match))
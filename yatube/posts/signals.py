@@ -0,0 +1,121 @@
+from core import object_cache
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from posts import timeline
+from posts.feed_cache import (author_scope, bump_feed_generation,
+                              group_scope, index_scope, post_scope,
+                              stats_scope, user_scope)
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+object_cache.register(Post)
+object_cache.register(Group, 'slug')
+object_cache.register(
+    User, 'username', only=('first_name', 'last_name')
+)
+
+
+def post_feed_scopes(post, *group_ids):
+    scopes = {
+        index_scope(), author_scope(post.author_id), post_scope(post.pk)
+    }
+    scopes.update(
+        group_scope(group_id) for group_id in group_ids if group_id
+    )
+    return scopes
+
+
+@receiver(pre_save, sender=Post)
+def post_remember_group(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        UserStats.objects.change(instance.author_id, post_count=1)
+        timeline.fan_out(instance)
+    bump_feed_generation(*post_feed_scopes(
+        instance,
+        instance.group_id,
+        getattr(instance, '_previous_group_id', None),
+    ))
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    UserStats.objects.change(instance.author_id, post_count=-1)
+    bump_feed_generation(*post_feed_scopes(instance, instance.group_id))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_feed_generation(index_scope(), group_scope(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_feed_generation(post_scope(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    bump_feed_generation(post_scope(instance.post_id))
+
+
+@receiver(pre_save, sender=User)
+def user_remember_username(sender, instance, raw=False, update_fields=None,
+                           **kwargs):
+    # Вход сохраняет только last_login, имя при этом не меняется.
+    if update_fields is not None and 'username' not in update_fields:
+        instance._previous_username = instance.username
+    elif instance.pk and not raw:
+        instance._previous_username = User.objects.filter(
+            pk=instance.pk
+        ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_username', None)
+    if not raw and not created and previous != instance.username:
+        # Имя выводится в общей ленте, профиле и лентах групп, где автор
+        # писал: их валидаторы не знают авторов страницы заранее.
+        group_ids = Post.objects.filter(author=instance.pk).order_by(
+        ).values_list('group_id', flat=True).distinct()
+        bump_feed_generation(
+            user_scope(instance.pk),
+            index_scope(),
+            author_scope(instance.pk),
+            *(group_scope(group_id) for group_id in group_ids if group_id),
+        )
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserStats.objects.change(instance.user_id, following_count=1)
+        UserStats.objects.change(instance.author_id, follower_count=1)
+        bump_feed_generation(
+            stats_scope(instance.user_id), stats_scope(instance.author_id)
+        )
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    UserStats.objects.change(instance.user_id, following_count=-1)
+    UserStats.objects.change(instance.author_id, follower_count=-1)
+    bump_feed_generation(
+        stats_scope(instance.user_id), stats_scope(instance.author_id)
+    )
+    timeline.prune(instance.user_id, instance.author_id)
@@ -0,0 +1,41 @@
+"""Пересчёт счётчиков ``UserStats`` по фактическим данным."""
+from django.db.models import Count
+from posts.models import Follow, Post, UserStats
+
+COUNTERS = ('post_count', 'follower_count', 'following_count')
+
+
+def count_by(queryset, field, user_ids):
+    rows = (
+        queryset.filter(**{f'{field}__in': user_ids})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('pk'))
+    )
+    return {row[field]: row['total'] for row in rows}
+
+
+def recount_chunk(user_ids):
+    """Пересчитывает счётчики пачки пользователей, возвращает число правок."""
+    actual = {
+        'post_count': count_by(Post.objects, 'author_id', user_ids),
+        'follower_count': count_by(Follow.objects, 'author_id', user_ids),
+        'following_count': count_by(Follow.objects, 'user_id', user_ids),
+    }
+    existing = UserStats.objects.in_bulk(user_ids)
+    to_create, to_update = [], []
+    for user_id in user_ids:
+        values = {
+            counter: actual[counter].get(user_id, 0) for counter in COUNTERS
+        }
+        stats = existing.get(user_id)
+        if stats is None:
+            to_create.append(UserStats(user_id=user_id, **values))
+        elif any(getattr(stats, name) != value
+                 for name, value in values.items()):
+            for name, value in values.items():
+                setattr(stats, name, value)
+            to_update.append(stats)
+    UserStats.objects.bulk_create(to_create)
+    UserStats.objects.bulk_update(to_update, COUNTERS)
+    return len(to_create) + len(to_update)
@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from posts.thumbnails import ready_variants
+from sorl.thumbnail import default
+
+register = template.Library()
+
+MIME_TYPES = {
+    'WEBP': 'image/webp',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'JPEG': 'image/jpeg',
+}
+
+
+@register.simple_tag
+def ready_thumbnail(file_, geometry, **options):
+    """
+    Готовая миниатюра из KV-хранилища или ``None``.
+
+    В отличие от ``{% thumbnail %}`` никогда не декодирует картинку в
+    запросе: миниатюры создаёт фоновый пул, пока их нет — шаблон
+    показывает заглушку.
+    """
+    return default.backend.get_ready_thumbnail(file_, geometry, **options)
+
+
+def srcset(variants):
+    return ', '.join(
+        f'{thumbnail.url} {width}w' for width, thumbnail in variants
+    )
+
+
+@register.inclusion_tag('includes/responsive_image.html')
+def responsive_image(file_, ready=None):
+    """
+    ``<picture>`` с вариантами картинки по ширине и формату.
+
+    В разметку попадают только уже созданные варианты; если готового
+    варианта в основном формате нет, выводится заглушка. ``ready`` —
+    варианты, заранее собранные ``prefetch_thumbnails`` для всей
+    страницы; без них варианты этой картинки читаются одним запросом.
+    """
+    if file_ and not ready:
+        ready, = ready_variants([file_])
+    variants = {}
+    for width, image_format, thumbnail in ready or ():
+        if thumbnail is not None:
+            variants.setdefault(image_format, []).append((width, thumbnail))
+    fallback = variants.pop(None, [])
+    return {
+        'has_image': bool(file_),
+        'sources': [
+            {'type': MIME_TYPES[image_format], 'srcset': srcset(group)}
+            for image_format, group in variants.items()
+        ],
+        'fallback': fallback[-1][1] if fallback else None,
+        'srcset': srcset(fallback),
+        'sizes': settings.POST_IMAGE_SIZES,
+    }
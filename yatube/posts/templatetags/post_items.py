@@ -0,0 +1,44 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+from posts.feed_cache import post_version
+from posts.thumbnails import prefetch_thumbnails
+
+register = template.Library()
+
+POST_ITEM_KEY = 'post_item:{pk}:{version}'
+
+
+def post_item_key(post):
+    """Ключ разметки поста в ленте (см. ``feed_cache.post_version``)."""
+    return POST_ITEM_KEY.format(pk=post.pk, version=post_version(post))
+
+
+@register.simple_tag
+def post_items(posts):
+    """
+    Готовая разметка ``includes/post_item.html`` для каждого поста.
+
+    Закешированные фрагменты читаются одним ``get_many``, недостающие
+    рендерятся и сохраняются одним ``set_many``; миниатюры для них
+    разрешаются заранее одним чтением KV-хранилища.
+    """
+    posts = list(posts)
+    keys = [post_item_key(post) for post in posts]
+    cached = cache.get_many(keys)
+    prefetch_thumbnails(
+        post for key, post in zip(keys, posts) if key not in cached
+    )
+    rendered = {}
+    item_template = get_template('includes/post_item.html')
+    items = []
+    for key, post in zip(keys, posts):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = item_template.render({'post': post})
+        items.append(mark_safe(html))
+    if rendered:
+        cache.set_many(rendered, settings.POST_ITEM_CACHE_TIMEOUT)
+    return items
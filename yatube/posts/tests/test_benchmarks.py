@@ -0,0 +1,63 @@
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+from posts import urls as posts_urls
+from posts.models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+class SeedAndBenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_scale', users=30, groups=3, posts=300, comments=200,
+            follows=5, seed=1, stdout=StringIO(),
+        )
+
+    def test_seed_scale_counts(self):
+        """Проверка объёма и согласованности созданных данных."""
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 200)
+        self.assertTrue(Follow.objects.exists())
+        self.assertFalse(Follow.objects.filter(user=F('author')).exists())
+        for stats in UserStats.objects.all():
+            with self.subTest(user=stats.user_id):
+                self.assertEqual(
+                    stats.post_count,
+                    Post.objects.filter(author=stats.user_id).count(),
+                )
+
+    def test_seed_scale_power_law(self):
+        """Проверка, что активность распределена неравномерно."""
+        totals = sorted(
+            User.objects.annotate(total=Count('posts'))
+            .values_list('total', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(totals[0], 3 * totals[len(totals) // 2])
+
+    def test_benchmark_views_report(self):
+        """Проверка JSON-отчёта замеров по всем страницам."""
+        out = StringIO()
+        call_command('benchmark_views', repeat=2, stdout=out)
+        report = json.loads(out.getvalue())
+        names = {
+            pattern.name for pattern in posts_urls.urlpatterns
+            if pattern.name not in ('profile_follow', 'profile_unfollow',
+                                    'post_comment')
+        }
+        self.assertEqual(set(report['views']), names)
+        for name, result in report['views'].items():
+            with self.subTest(name=name):
+                self.assertEqual(result['status'], 200)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+                self.assertGreater(result['queries'], 0)
+                self.assertIn('local_hit_ratio', result['cache'])
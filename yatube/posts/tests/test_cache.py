@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
-from posts.models import Post
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Group, Post
 
 User = get_user_model()
 
@@ -10,17 +12,76 @@ class PostCreateFormTests(TestCase):
     def setUpClass(cls):
         super().setUpClass()
         cls.author = User.objects.create(username='test_user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
 
     def setUp(self) -> None:
         super().setUp()
+        cache.clear()
         self.guest_client = Client()
 
     def test_cashe(self):
         """Проверка хранения поста в кэше. """
-        Post.objects.create(text='test_note', author=self.author)
+        post = Post.objects.create(text='test_note', author=self.author)
         request1 = self.guest_client.get('/')
-        Post.objects.all().delete()
+        # update() не посылает сигналов, поэтому кеш не сбрасывается.
+        Post.objects.filter(pk=post.pk).update(text='changed_note')
         request2 = self.guest_client.get('/')
         request1_content = str(request1.content)
         request2_content = str(request2.content)
         self.assertHTMLEqual(request1_content, request2_content)
+
+    def test_cache_invalidated_on_delete(self):
+        """Проверка, что удаление поста сразу сбрасывает кеш ленты."""
+        Post.objects.create(text='test_note', author=self.author)
+        request1 = self.guest_client.get('/')
+        Post.objects.all().delete()
+        request2 = self.guest_client.get('/')
+        self.assertContains(request1, 'test_note')
+        self.assertNotContains(request2, 'test_note')
+
+    def test_cache_invalidated_on_create(self):
+        """Проверка, что новый пост сразу появляется в ленте группы."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        self.guest_client.get(url)
+        Post.objects.create(
+            text='fresh_note', author=self.author, group=self.group
+        )
+        self.assertContains(self.guest_client.get(url), 'fresh_note')
+
+    def test_cache_keyed_on_page(self):
+        """Проверка, что разные страницы ленты кешируются отдельно."""
+        for number in range(13):
+            Post.objects.create(text=f'note_{number}', author=self.author)
+        first_page = self.guest_client.get('/')
+        second_page = self.guest_client.get('/?page=2')
+        self.assertContains(first_page, 'note_12')
+        self.assertNotContains(second_page, 'note_12')
+        self.assertContains(second_page, 'note_0')
+
+    @override_settings(
+        FEED_CACHE_TIMEOUT=0, PAGE_CACHE_TIMEOUT=0, POST_ITEM_CACHE_TIMEOUT=0
+    )
+    def test_cache_timeout_from_settings(self):
+        """Проверка, что время жизни кеша берётся из настроек."""
+        post = Post.objects.create(text='test_note', author=self.author)
+        self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'test_user'})
+        )
+        Post.objects.filter(pk=post.pk).update(text='changed_note')
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': 'test_user'})
+        )
+        self.assertContains(response, 'changed_note')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0, POST_ITEM_CACHE_TIMEOUT=0)
+    def test_cache_key_ignores_extra_params(self):
+        """Проверка, что лишние параметры запроса не плодят записи кеша."""
+        post = Post.objects.create(text='test_note', author=self.author)
+        self.guest_client.get('/?utm=1')
+        Post.objects.filter(pk=post.pk).update(text='changed_note')
+        response = self.guest_client.get('/?utm=2&after=broken')
+        self.assertContains(response, 'test_note')
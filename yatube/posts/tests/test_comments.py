@@ -0,0 +1,96 @@
+import base64
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_FIRST_PAGE=3, COMMENTS_PAGE_SIZE=2)
+class CommentPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(text='Пост', author=cls.author)
+        for number in range(6):
+            Comment.objects.create(
+                post=cls.post, author=cls.author, text=f'Комментарий {number}'
+            )
+        cls.detail_url = reverse(
+            'posts:post_detail', kwargs={'post_id': cls.post.pk}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_first_render_is_capped(self):
+        """Проверка, что post_detail выводит только первую порцию."""
+        response = self.client.get(self.detail_url)
+        comments = [comment.text for comment in response.context['comments']]
+        self.assertEqual(
+            comments, ['Комментарий 5', 'Комментарий 4', 'Комментарий 3']
+        )
+        self.assertIsNotNone(response.context['comments_next_url'])
+        self.assertContains(response, 'Показать ещё комментарии')
+
+    def test_fragment_continues_after_cursor(self):
+        """Проверка, что фрагмент отдаёт следующие порции до конца."""
+        url = self.client.get(self.detail_url).context['comments_next_url']
+        texts = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, '<html')
+            texts.extend(
+                comment.text for comment in response.context['comments']
+            )
+            url = response.context['comments_next_url']
+        self.assertEqual(
+            texts, ['Комментарий 2', 'Комментарий 1', 'Комментарий 0']
+        )
+
+    def test_fragment_without_cursor_starts_from_newest(self):
+        """Проверка, что фрагмент без курсора начинает с новых."""
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+            + '?after=мусор'
+        )
+        comments = [comment.text for comment in response.context['comments']]
+        self.assertEqual(comments, ['Комментарий 5', 'Комментарий 4'])
+
+    def test_fragment_malformed_cursor(self):
+        """Проверка, что курсор с чужими типами значений не даёт 500."""
+        url = reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+        for values in ([None, None], [1.5, 2], [[1], [2]]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()
+            ).decode()
+            with self.subTest(values=values):
+                response = self.client.get(url, {'after': cursor})
+                self.assertEqual(response.status_code, 200)
+                comments = [
+                    comment.text for comment in response.context['comments']
+                ]
+                self.assertEqual(comments, ['Комментарий 5', 'Комментарий 4'])
+
+    def test_fragment_unknown_post(self):
+        """Проверка, что фрагмент несуществующего поста отдаёт 404."""
+        response = self.client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_last_page_has_no_more_link(self):
+        """Проверка, что без следующей порции кнопки нет."""
+        Comment.objects.filter(pk__in=list(
+            Comment.objects.order_by('pk').values_list('pk', flat=True)[:3]
+        )).delete()
+        response = self.client.get(self.detail_url)
+        self.assertIsNone(response.context['comments_next_url'])
+        self.assertNotContains(response, 'Показать ещё комментарии')
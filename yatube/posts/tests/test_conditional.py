@@ -0,0 +1,180 @@
+from django.contrib.auth import get_user_model
+from core.testing import QueryBudgetMixin
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def revalidate(self, client, url):
+        """Повторный запрос с валидаторами из первого ответа."""
+        response = client.get(url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+        return client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_conditional_not_modified(self):
+        """Проверка ответа 304 без выборки ленты и рендера."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                revalidated = self.assertQueryBudget(
+                    self.guest_client, url, 3,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                )
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b'')
+
+    def test_conditional_if_modified_since(self):
+        """Проверка ответа 304 по заголовку If-Modified-Since."""
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        revalidated = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_conditional_changed_by_writes(self):
+        """Проверка, что изменения в ленте меняют ETag."""
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        Post.objects.filter(text='Новый пост').delete()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Новый пост')
+
+    def test_conditional_post_detail_comments(self):
+        """Проверка, что новый комментарий меняет ETag поста."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.guest_client.get(url)['ETag']
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Комментарий')
+
+    def test_conditional_comment_deleted(self):
+        """Проверка, что удаление старого комментария меняет ETag поста."""
+        old = Comment.objects.create(
+            post=self.post, author=self.reader, text='Старый комментарий'
+        )
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий'
+        )
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = self.revalidate(self.guest_client, url)
+        self.assertEqual(response.status_code, 304)
+        old.delete()
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'Старый комментарий')
+
+    def test_conditional_group_renamed(self):
+        """Проверка, что смена адреса группы меняет ETag поста и профиля."""
+        urls = (
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        etags = {url: self.guest_client.get(url)['ETag'] for url in urls}
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'renamed-slug'
+        group.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '/group/renamed-slug/')
+
+    def test_conditional_author_renamed(self):
+        """Проверка, что переименование автора меняет ETag его лент."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        etags = {url: self.guest_client.get(url)['ETag'] for url in urls}
+        author = User.objects.get(pk=self.author.pk)
+        author.username = 'zed'
+        author.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url]
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, '/profile/zed/')
+                self.assertNotContains(response, '/profile/author/')
+
+    def test_conditional_commenter_renamed(self):
+        """Проверка, что переименование комментатора меняет ETag поста."""
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        etag = self.guest_client.get(url)['ETag']
+        reader = User.objects.get(pk=self.reader.pk)
+        reader.username = 'renamed-reader'
+        reader.save()
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'renamed-reader')
+
+    def test_conditional_per_user(self):
+        """Проверка, что ETag зависит от пользователя и подписки."""
+        url = reverse('posts:profile', kwargs={'username': 'author'})
+        guest_etag = self.guest_client.get(url)['ETag']
+        reader_etag = self.reader_client.get(url)['ETag']
+        self.assertNotEqual(guest_etag, reader_etag)
+        Follow.objects.create(user=self.reader, author=self.author)
+        response = self.reader_client.get(
+            url, HTTP_IF_NONE_MATCH=reader_etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['following'])
+
+    def test_conditional_missing_object(self):
+        """Проверка, что для несуществующих страниц остаётся 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
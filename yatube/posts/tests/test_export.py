@@ -0,0 +1,102 @@
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.old = Post.objects.create(
+            text='Старый пост', author=cls.author, group=cls.group
+        )
+        cls.new = Post.objects.create(text='Новый пост', author=cls.author)
+        Post.objects.filter(pk=cls.old.pk).update(
+            pub_date=timezone.make_aware(datetime(2015, 1, 1))
+        )
+        Comment.objects.create(
+            post=cls.new, author=cls.reader, text='Комментарий'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def export(self, name, **options):
+        descriptor, path = tempfile.mkstemp()
+        os.close(descriptor)
+        self.addCleanup(os.remove, path)
+        call_command(
+            'export_data', name, output=path, stdout=io.StringIO(),
+            **options
+        )
+        with open(path, 'rb') as file:
+            return file.read()
+
+    def test_export_jsonl(self):
+        """Проверка выгрузки постов в JSONL."""
+        lines = self.export('posts', chunk_size=1).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['id'] for row in rows],
+                         [self.old.pk, self.new.pk])
+        self.assertEqual(rows[0]['author'], 'author')
+        self.assertEqual(rows[0]['group'], 'test-slug')
+        self.assertIsNone(rows[1]['group'])
+
+    def test_export_csv_gzip(self):
+        """Проверка выгрузки в CSV со сжатием gzip."""
+        content = gzip.decompress(
+            self.export('follows', format='csv', gzip=True)
+        ).decode()
+        rows = list(csv.DictReader(io.StringIO(content)))
+        self.assertEqual(rows, [{
+            'id': str(Follow.objects.get().pk),
+            'user': 'reader',
+            'author': 'author',
+        }])
+
+    def test_export_date_range(self):
+        """Проверка фильтра по периоду."""
+        lines = self.export(
+            'posts', since='2014-12-31', until='2015-01-01'
+        ).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['text'], 'Старый пост')
+        self.assertEqual(
+            len(self.export('comments', since='2015-01-02').splitlines()), 1
+        )
+
+    def test_export_admin_action(self):
+        """Проверка потоковой выгрузки из админки."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.post(reverse('admin:posts_post_changelist'), {
+            'action': 'export_csv',
+            '_selected_action': [self.new.pk],
+        })
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        self.assertEqual([row['text'] for row in rows], ['Новый пост'])
@@ -0,0 +1,99 @@
+from core.testing import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class SyndicationFeedTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Пост в группе', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            reverse('posts:index_rss'): 'application/rss+xml',
+            reverse('posts:index_atom'): 'application/atom+xml',
+            reverse('posts:group_rss', kwargs={'slug': 'test-slug'}):
+                'application/rss+xml',
+            reverse('posts:group_atom', kwargs={'slug': 'test-slug'}):
+                'application/atom+xml',
+            reverse('posts:profile_rss', kwargs={'username': 'author'}):
+                'application/rss+xml',
+            reverse('posts:profile_atom', kwargs={'username': 'author'}):
+                'application/atom+xml',
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feeds_content(self):
+        """Проверка RSS и Atom для ленты, группы и автора."""
+        for url, content_type in self.urls.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type
+                ))
+                self.assertContains(response, 'Пост в группе')
+                self.assertContains(response, reverse(
+                    'posts:post_detail', kwargs={'post_id': self.post.pk}
+                ))
+
+    def test_feeds_cached_single_lookup(self):
+        """Проверка, что повторный опрос берёт XML из кеша."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                cached = self.assertQueryBudget(self.guest_client, url, 1)
+                self.assertEqual(cached.content, response.content)
+                revalidated = self.assertQueryBudget(
+                    self.guest_client, url, 1,
+                    HTTP_IF_NONE_MATCH=response['ETag'],
+                )
+                self.assertEqual(revalidated.status_code, 304)
+
+    def test_feeds_follow_changes(self):
+        """Проверка, что новые и изменённые посты попадают в ленту."""
+        url = reverse('posts:group_rss', kwargs={'slug': 'test-slug'})
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(
+            text='Свежий пост', author=self.author, group=self.group
+        )
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Свежий пост')
+        post = Post.objects.get(text='Свежий пост')
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertContains(self.guest_client.get(url), 'Исправленный пост')
+
+    def test_feeds_missing_scope(self):
+        """Проверка 404 для несуществующих группы и автора."""
+        urls = (
+            reverse('posts:group_rss', kwargs={'slug': 'missing'}),
+            reverse('posts:profile_atom', kwargs={'username': 'missing'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+
+    def test_feeds_linked_from_pages(self):
+        """Проверка ссылок на ленты в разметке страниц."""
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        )
+        self.assertContains(response, reverse(
+            'posts:group_atom', kwargs={'slug': 'test-slug'}
+        ))
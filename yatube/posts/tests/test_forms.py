@@ -1,6 +1,7 @@
 import shutil
 import tempfile
 
+from core import object_cache
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
@@ -177,3 +178,18 @@ class PostCreateFormTests(TestCase):
             post_count + 1,
             'Ошибка количества постов, после добавления поста с изображением.'
         )
+
+    def test_forms_post_edit_ignores_cached_copy(self):
+        """Проверка, что правка не записывает устаревшую копию из кеша."""
+        object_cache.get_object(Post, pk=self.post_new.pk)
+        # update() не посылает сигналов: в кеше остаётся старая картинка.
+        Post.objects.filter(pk=self.post_new.pk).update(
+            image='posts/other.gif'
+        )
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post_new.pk}),
+            data={'text': 'Edited text', 'group': self.group.pk},
+        )
+        post = Post.objects.get(pk=self.post_new.pk)
+        self.assertEqual(post.text, 'Edited text')
+        self.assertEqual(post.image.name, 'posts/other.gif')
@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+from datetime import datetime
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from posts import timeline
+from posts.models import Follow, Group, Post, TimelineEntry, UserStats
+from posts.search import search_post_ids
+
+User = get_user_model()
+
+
+class ImportPostsCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def write_file(self, suffix, content):
+        descriptor, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+            file.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def import_posts(self, path, **options):
+        out = StringIO()
+        call_command('import_posts', path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_jsonl(self):
+        """Проверка загрузки JSONL с сохранением даты и пропуском ошибок."""
+        rows = [
+            {'text': 'Импорт про кактусы', 'author': 'author',
+             'group': 'test-slug', 'pub_date': '2015-03-01T10:00:00'},
+            {'text': 'Без группы', 'author': 'author'},
+            {'text': 'Чужой автор', 'author': 'nobody'},
+            {'text': 'Плохая дата', 'author': 'author', 'pub_date': 'вчера'},
+        ]
+        path = self.write_file('.jsonl', '\n'.join(
+            [json.dumps(row, ensure_ascii=False) for row in rows]
+            + ['{не json']
+        ))
+        out = self.import_posts(path, batch_size=2, batches_per_transaction=1)
+        self.assertIn('Загружено постов: 2, пропущено: 3', out)
+        post = Post.objects.get(text='Импорт про кактусы')
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(
+            post.pub_date,
+            timezone.make_aware(datetime(2015, 3, 1, 10, 0)),
+        )
+        self.assertEqual(UserStats.objects.get(user=self.author).post_count, 2)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 2
+        )
+        self.assertEqual(search_post_ids('кактусы', 10), [post.pk])
+
+    def test_import_csv_create_missing(self):
+        """Проверка загрузки CSV с созданием авторов и групп."""
+        path = self.write_file(
+            '.csv',
+            'text,author,group,pub_date\n'
+            'Новый автор,newcomer,new-group,2020-01-01T00:00:00+00:00\n'
+            'Второй пост,newcomer,,\n',
+        )
+        self.import_posts(path, create_missing=True)
+        newcomer = User.objects.get(username='newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(newcomer.posts.count(), 2)
+        self.assertTrue(Group.objects.filter(slug='new-group').exists())
+        self.assertEqual(UserStats.objects.get(user=newcomer).post_count, 2)
+
+    def test_import_fans_out_only_new_posts(self):
+        """Проверка, что загрузка не пересобирает ленты подписчиков."""
+        other = User.objects.create_user(username='other')
+        Post.objects.create(text='Старый пост', author=self.author)
+        Post.objects.create(text='Чужой пост', author=other)
+        Follow.objects.create(user=self.reader, author=other)
+        path = self.write_file('.jsonl', json.dumps(
+            {'text': 'Новый пост', 'author': 'author'}, ensure_ascii=False
+        ))
+        with mock.patch(
+            'posts.timeline.backfill', wraps=timeline.backfill
+        ) as backfill:
+            self.import_posts(path)
+        backfill.assert_not_called()
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.reader)
+                .values_list('post__text', flat=True)),
+            {'Старый пост', 'Чужой пост', 'Новый пост'},
+        )
+
+    def test_import_keeps_search_trigger(self):
+        """Проверка, что после загрузки новые посты снова индексируются."""
+        path = self.write_file('.jsonl', '')
+        self.import_posts(path)
+        post = Post.objects.create(text='Про кипарисы', author=self.author)
+        self.assertEqual(search_post_ids('кипарисы', 10), [post.pk])
+
+    def test_import_failure_keeps_derived_data(self):
+        """Проверка, что сбой посреди загрузки не рассинхронизирует данные."""
+        rows = [
+            {'text': f'Кактус {number}', 'author': 'author'}
+            for number in range(3)
+        ]
+        path = self.write_file('.jsonl', '\n'.join(
+            json.dumps(row, ensure_ascii=False) for row in rows
+        ))
+        original = Post.objects.bulk_create
+        calls = []
+
+        def failing_bulk_create(posts, *args, **kwargs):
+            calls.append(posts)
+            if len(calls) > 1:
+                raise RuntimeError('сбой загрузки')
+            return original(posts, *args, **kwargs)
+
+        with mock.patch.object(
+            Post.objects, 'bulk_create', side_effect=failing_bulk_create
+        ):
+            with self.assertRaises(RuntimeError):
+                self.import_posts(
+                    path, batch_size=1, batches_per_transaction=1
+                )
+        self.assertEqual(UserStats.objects.get(user=self.author).post_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 1
+        )
+        self.assertEqual(len(search_post_ids('кактус', 10)), 1)
+        post = Post.objects.create(text='Про кипарисы', author=self.author)
+        self.assertEqual(search_post_ids('кипарисы', 10), [post.pk])
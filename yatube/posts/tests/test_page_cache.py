@@ -0,0 +1,204 @@
+import threading
+import time
+
+from core import stampede
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.urls import reverse
+from posts.feed_cache import bump_feed_generation
+from posts.models import Comment, Follow, Group, Post
+from posts.page_cache import _page_key, cache_anonymous_page, tag_page
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            'other_group': reverse(
+                'posts:group_list', kwargs={'slug': 'other-slug'}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': 'author'}
+            ),
+            'detail': reverse(
+                'posts:post_detail', kwargs={'post_id': cls.post.pk}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def warm(self):
+        for url in self.urls.values():
+            self.guest_client.get(url)
+
+    def cache_status(self):
+        return {
+            name: self.guest_client.get(url).get('X-Page-Cache')
+            for name, url in self.urls.items()
+        }
+
+    def test_anonymous_pages_cached(self):
+        """Проверка, что повторный анонимный запрос не обращается к базе."""
+        self.warm()
+        for url in self.urls.values():
+            with self.subTest(url=url), self.assertNumQueries(0):
+                response = self.guest_client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+
+    def test_authorized_user_never_cached(self):
+        """Проверка, что авторизованный пользователь не видит кеш."""
+        self.warm()
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                response = self.reader_client.get(url)
+                self.assertFalse(response.has_header('X-Page-Cache'))
+                self.assertIsNotNone(response.context)
+
+    def test_not_modified_from_cache(self):
+        """Проверка, что страница из кеша отвечает 304 по ETag."""
+        etag = self.guest_client.get(self.urls['detail'])['ETag']
+        response = self.guest_client.get(
+            self.urls['detail'], HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_comment_purges_post_page_only(self):
+        """Проверка, что комментарий сбрасывает только страницу поста."""
+        self.warm()
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Новый комментарий'
+        )
+        self.assertEqual(self.cache_status(), {
+            'index': 'hit',
+            'group': 'hit',
+            'other_group': 'hit',
+            'profile': 'hit',
+            'detail': 'miss',
+        })
+
+    def test_new_post_purges_its_feeds(self):
+        """Проверка, что новый пост сбрасывает ленты, куда он попал."""
+        self.warm()
+        Post.objects.create(
+            text='Свежий пост', author=self.author, group=self.group
+        )
+        status = self.cache_status()
+        for name in ('index', 'group', 'profile', 'detail'):
+            with self.subTest(name=name):
+                self.assertEqual(status[name], 'miss')
+        self.assertEqual(status['other_group'], 'hit')
+        self.assertContains(
+            self.guest_client.get(self.urls['group']), 'Свежий пост'
+        )
+
+    def test_follow_purges_profile_only(self):
+        """Проверка, что подписка сбрасывает только профиль автора."""
+        self.warm()
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.cache_status(), {
+            'index': 'hit',
+            'group': 'hit',
+            'other_group': 'hit',
+            'profile': 'miss',
+            'detail': 'hit',
+        })
+        self.assertContains(
+            self.guest_client.get(self.urls['profile']),
+            'Всего подписчиков: 1',
+        )
+
+    def test_rename_purges_pages_with_author(self):
+        """Проверка, что переименование автора сбрасывает его страницы."""
+        self.warm()
+        author = User.objects.get(pk=self.author.pk)
+        author.username = 'renamed'
+        author.save()
+        status = self.cache_status()
+        for name in ('index', 'group', 'detail'):
+            with self.subTest(name=name):
+                self.assertEqual(status[name], 'miss')
+                response = self.guest_client.get(self.urls[name])
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+                self.assertContains(response, '/profile/renamed/')
+                self.assertNotContains(response, '/profile/author/')
+        self.assertEqual(status['other_group'], 'hit')
+
+
+@override_settings(CACHE_STAMPEDE_WAIT=2)
+class PageCacheStampedeTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.renders = 0
+
+        @cache_anonymous_page
+        def view(request):
+            self.renders += 1
+            tag_page(request, 'index')
+            time.sleep(0.3)
+            return HttpResponse(f'render {self.renders}')
+
+        self.view = view
+
+    def get(self):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        return self.view(request)
+
+    def test_concurrent_misses_render_once(self):
+        """Проверка, что одновременные промахи рендерят страницу один раз."""
+        responses = []
+
+        def worker():
+            responses.append(self.get())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.renders, 1)
+        self.assertEqual(
+            sorted(response['X-Page-Cache'] for response in responses),
+            ['hit', 'hit', 'hit', 'miss'],
+        )
+        for response in responses:
+            self.assertEqual(response.content, b'render 1')
+
+    def test_stale_page_served_while_rendering(self):
+        """Проверка, что пока страницу рендерит другой, отдаётся прежняя."""
+        self.get()
+        bump_feed_generation('index')
+        request = RequestFactory().get('/')
+        cache.add(stampede.LOCK_KEY.format(key=_page_key(request)), True, 10)
+        response = self.get()
+        self.assertEqual(response['X-Page-Cache'], 'stale')
+        self.assertEqual(response.content, b'render 1')
+        self.assertEqual(self.renders, 1)
@@ -0,0 +1,105 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Follow, Group, Post
+from posts.templatetags.post_items import post_items
+
+User = get_user_model()
+
+
+class PostItemCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+        for number in range(3):
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def items(self):
+        posts = Post.objects.select_related('author', 'group')
+        return ''.join(post_items(posts))
+
+    def test_items_read_with_one_get_many(self):
+        """Проверка, что повторный рендер берёт все посты одним запросом."""
+        self.items()
+        with mock.patch(
+            'posts.templatetags.post_items.get_template'
+        ) as get_template, mock.patch.object(
+            cache, 'get_many', wraps=cache.get_many
+        ) as get_many:
+            html = self.items()
+        get_template.return_value.render.assert_not_called()
+        self.assertEqual(get_many.call_count, 1)
+        self.assertIn('Пост 2', html)
+
+    def test_item_changes_with_edit(self):
+        """Проверка, что правка поста меняет ключ его разметки."""
+        self.items()
+        post = Post.objects.latest('pk')
+        post.text = 'Исправленный пост'
+        post.group = self.other_group
+        post.save()
+        html = self.items()
+        self.assertIn('Исправленный пост', html)
+        self.assertIn(
+            reverse('posts:group_list', kwargs={'slug': 'other-slug'}), html
+        )
+
+    def test_item_changes_with_author_rename(self):
+        """Проверка, что переименование автора меняет ключ разметки."""
+        self.items()
+        author = User.objects.get(pk=self.author.pk)
+        author.username = 'renamed'
+        author.save()
+        self.assertIn(
+            reverse('posts:profile', kwargs={'username': 'renamed'}),
+            self.items(),
+        )
+
+    def test_feed_pages_follow_author_rename(self):
+        """Проверка, что ленты с фрагментом страницы видят новое имя."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+        )
+        for url in urls:
+            self.reader_client.get(url)
+        # Без сигналов: поколения лент остаются прежними, меняются только
+        # версии постов.
+        User.objects.filter(pk=self.author.pk).update(username='zed')
+        urls = urls[:2] + (
+            reverse('posts:profile', kwargs={'username': 'zed'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.reader_client.get(url)
+                self.assertContains(response, '/profile/zed/')
+                self.assertNotContains(response, '/profile/author/')
+
+    def test_feed_separators(self):
+        """Проверка, что посты ленты разделены одной чертой."""
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, '<hr>', count=2)
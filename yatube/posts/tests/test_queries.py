@@ -0,0 +1,85 @@
+from core.testing import QueryBudgetMixin
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+POSTS_COUNT = 10
+
+
+class PostsQueryBudgetTests(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Общая группа',
+            slug='common',
+            description='Тестовое описание',
+        )
+        for number in range(POSTS_COUNT):
+            author = User.objects.create_user(username=f'author{number}')
+            group = Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group-{number}',
+                description='Тестовое описание',
+            )
+            cls.post = Post.objects.create(
+                text=f'Пост {number}',
+                author=author,
+                group=group,
+            )
+            Post.objects.create(
+                text=f'Пост в общей группе {number}',
+                author=author,
+                group=cls.group,
+            )
+            Comment.objects.create(
+                text=f'Комментарий {number}',
+                author=author,
+                post=cls.post,
+            )
+            Follow.objects.create(user=cls.reader, author=author)
+        cls.author = cls.post.author
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_queries_public_pages_within_budget(self):
+        """Проверка бюджета запросов публичных страниц.
+
+        Валидаторы ETag и Last-Modified добавляют к бюджету по одному
+        агрегату, найденные ими объекты представление не выбирает заново.
+        """
+        budgets = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list', kwargs={'slug': 'common'}): 3,
+            reverse(
+                'posts:profile', kwargs={'username': self.author.username}
+            ): 4,
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}): 5,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.guest_client, url, budget)
+
+    def test_queries_private_pages_within_budget(self):
+        """Проверка бюджета запросов страниц для авторизованных."""
+        budgets = {
+            reverse('posts:follow_index'): 3,
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}): 4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url):
+                self.assertQueryBudget(self.author_client, url, budget)
+        self.assertQueryBudget(
+            self.reader_client, reverse('posts:follow_index'), 3
+        )
@@ -0,0 +1,120 @@
+import re
+
+from core.paginator import CursorPaginator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+#   таблицы, по которым строятся ленты и которые растут без ограничений
+FEED_TABLES = ('posts_post', 'posts_comment', 'posts_timelineentry')
+
+FULL_SCAN_RE = re.compile(r'^SCAN (TABLE )?(\w+)$')
+
+
+@override_settings(POSTS_PER_PAGE=2, PAGINATOR_OFFSET_PAGES=1)
+class QueryPlanTests(TestCase):
+    """
+    Планы запросов лент (EXPLAIN QUERY PLAN).
+
+    Выборка страницы должна идти по индексу в нужном порядке: полный
+    просмотр таблицы или сортировка во временном B-дереве растут вместе
+    с таблицей и не видны на маленьких тестовых данных.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(6):
+            Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.latest('pk')
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def comment_cursor(self):
+        paginator = CursorPaginator(
+            Comment.objects.all(), 1, ordering=('-created', '-pk')
+        )
+        return paginator.encode_cursor(self.comment)
+
+    def feed_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.reader_client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        return [
+            query['sql'] for query in captured.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'ORDER BY' in query['sql']
+            and any(f'FROM "{table}"' in query['sql']
+                    for table in FEED_TABLES)
+        ]
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def assertIndexedPlan(self, sql):
+        plan = self.query_plan(sql)
+        for step in plan:
+            match = FULL_SCAN_RE.match(step)
+            self.assertFalse(
+                match and match.group(2) in FEED_TABLES,
+                f'Полный просмотр таблицы:\n{sql}\n' + '\n'.join(plan),
+            )
+            self.assertNotIn(
+                'TEMP B-TREE', step,
+                f'Сортировка без индекса:\n{sql}\n' + '\n'.join(plan),
+            )
+
+    def test_query_plans_use_indexes(self):
+        """Проверка, что основные запросы лент идут по индексам."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=3',
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'}),
+            reverse('posts:profile', kwargs={'username': 'author'}),
+            reverse('posts:profile', kwargs={'username': 'author'})
+            + '?page=last',
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk})
+            + '?after=' + self.comment_cursor(),
+            reverse('posts:follow_index'),
+            reverse('api:post_list'),
+            reverse('api:post_comments', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                queries = self.feed_queries(url)
+                self.assertTrue(queries, f'{url}: нет запроса ленты')
+                for sql in queries:
+                    self.assertIndexedPlan(sql)
+
+    def test_query_plans_detect_scan(self):
+        """Проверка, что тест ловит сортировку без индекса."""
+        sql = str(Post.objects.order_by('text').query)
+        with self.assertRaises(AssertionError):
+            self.assertIndexedPlan(sql)
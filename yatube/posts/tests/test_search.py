@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from posts.models import Post
+from posts.search import build_match_query, search_post_ids
+
+User = get_user_model()
+
+
+class PostsSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.weak = Post.objects.create(
+            text='Длинный рассказ о походе в горы, где упомянуты кактусы '
+                 'лишь однажды среди множества других слов и событий',
+            author=cls.author,
+        )
+        cls.strong = Post.objects.create(
+            text='Кактусы, кактусы и ещё раз кактусы',
+            author=cls.author,
+        )
+        Post.objects.create(text='Про другое', author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        return self.guest_client.get(
+            reverse('posts:search'), {'q': query, **params}
+        )
+
+    def test_search_ranked_results(self):
+        """Проверка, что результаты отсортированы по релевантности."""
+        response = self.search('кактусы')
+        self.assertEqual(
+            response.context['posts'], [self.strong, self.weak]
+        )
+
+    def test_search_prefix_and_case(self):
+        """Проверка поиска по началу слова без учёта регистра."""
+        self.assertEqual(len(self.search('КАКТ').context['posts']), 2)
+
+    def test_search_index_follows_writes(self):
+        """Проверка синхронизации индекса при изменении и удалении."""
+        strong = Post.objects.get(pk=self.strong.pk)
+        strong.text = 'Теперь про кипарисы'
+        strong.save()
+        self.assertEqual(self.search('кактусы').context['posts'], [self.weak])
+        self.assertEqual(search_post_ids('кипарисы', 10), [strong.pk])
+        Post.objects.filter(pk=self.weak.pk).delete()
+        self.assertEqual(self.search('кактусы').context['posts'], [])
+
+    def test_search_operators_are_escaped(self):
+        """Проверка, что синтаксис FTS5 во вводе не ломает запрос."""
+        self.assertEqual(build_match_query('"a" OR b*'), '"a" "OR" "b"*')
+        response = self.search('кактусы" OR (NEAR')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts'], [])
+
+    @override_settings(POSTS_PER_PAGE=1)
+    def test_search_pagination(self):
+        """Проверка постраничного вывода результатов."""
+        first = self.search('кактусы')
+        second = self.search('кактусы', page=2)
+        self.assertEqual(first.context['next_number'], 2)
+        self.assertEqual(second.context['posts'], [self.weak])
+        self.assertIsNone(second.context['next_number'])
+
+    def test_search_admin_uses_index(self):
+        """Проверка, что поиск в админке идёт через индекс."""
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'кактусы'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.strong, self.weak},
+        )
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Follow, Post, UserStats
+
+User = get_user_model()
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get_stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_stats_post_create_and_delete(self):
+        """Проверка счётчика статей при создании и удалении поста."""
+        self.author_client.post(
+            reverse('posts:post_create'), data={'text': 'Новый пост'}
+        )
+        self.assertEqual(self.get_stats(self.author).post_count, 1)
+        Post.objects.filter(author=self.author).delete()
+        self.assertEqual(self.get_stats(self.author).post_count, 0)
+
+    def test_stats_follow_and_unfollow(self):
+        """Проверка счётчиков подписок при подписке и отписке."""
+        self.reader_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(self.get_stats(self.author).follower_count, 1)
+        self.assertEqual(self.get_stats(self.reader).following_count, 1)
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(self.get_stats(self.author).follower_count, 0)
+        self.assertEqual(self.get_stats(self.reader).following_count, 0)
+
+    def test_stats_cascade_user_delete(self):
+        """Проверка счётчиков при каскадном удалении подписчика."""
+        follower = User.objects.create_user(username='follower')
+        Follow.objects.create(user=follower, author=self.author)
+        Post.objects.create(text='Пост', author=follower)
+        follower.delete()
+        self.assertEqual(self.get_stats(self.author).follower_count, 0)
+        self.assertFalse(
+            UserStats.objects.filter(user_id=follower.pk).exists()
+        )
+
+    def test_stats_profile_does_not_count(self):
+        """Проверка, что профиль не выполняет COUNT(*) по связям."""
+        Post.objects.create(text='Пост', author=self.author)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reader_client.get(
+                reverse('posts:profile', kwargs={'username': 'author'})
+            )
+        self.assertEqual(response.context['stats'].post_count, 1)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+    def test_stats_recount_command_fixes_drift(self):
+        """Проверка, что команда пересчёта исправляет расхождения."""
+        Post.objects.create(text='Пост', author=self.author)
+        UserStats.objects.filter(user=self.author).update(
+            post_count=42, follower_count=7
+        )
+        call_command('recount_user_stats', chunk_size=1, stdout=StringIO())
+        stats = self.get_stats(self.author)
+        self.assertEqual(stats.post_count, 1)
+        self.assertEqual(stats.follower_count, 0)
+        self.assertEqual(self.get_stats(self.reader).post_count, 0)
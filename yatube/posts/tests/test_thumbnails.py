@@ -0,0 +1,212 @@
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from posts.models import Post
+from posts.templatetags.post_images import responsive_image
+from posts.thumbnails import (LOCK_KEY, enqueue_thumbnails,
+                              generate_thumbnails, prefetch_thumbnails,
+                              responsive_variants)
+from sorl.thumbnail import default
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=0)
+class ThumbnailPregenerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def create_post(self, name='small.gif'):
+        return Post.objects.create(
+            text='Пост с картинкой',
+            author=self.author,
+            image=SimpleUploadedFile(
+                name=name, content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+
+    def ready_thumbnail(self, post):
+        geometry, options = settings.POST_THUMBNAILS[0]
+        return default.backend.get_ready_thumbnail(
+            post.image, geometry, **options
+        )
+
+    def test_thumbnails_placeholder_until_generated(self):
+        """Проверка, что до генерации миниатюры выводится заглушка."""
+        post = self.create_post()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'aspect-ratio: 960 / 339')
+        self.assertIsNone(self.ready_thumbnail(post))
+
+    def test_thumbnails_rendered_after_generation(self):
+        """Проверка, что готовая миниатюра попадает в ленту."""
+        post = self.create_post()
+        generate_thumbnails(post.image.name)
+        thumbnail = self.ready_thumbnail(post)
+        cache.clear()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, thumbnail.url)
+        self.assertNotContains(response, 'aspect-ratio: 960 / 339')
+
+    def test_thumbnails_scheduled_on_create(self):
+        """Проверка, что создание поста с картинкой ставит её в очередь."""
+        with mock.patch(
+            'posts.thumbnails.transaction.on_commit',
+            side_effect=lambda callback: callback(),
+        ):
+            self.client.post(reverse('posts:post_create'), data={
+                'text': 'Новый пост',
+                'image': SimpleUploadedFile(
+                    name='new.gif', content=SMALL_GIF,
+                    content_type='image/gif',
+                ),
+            })
+        post = Post.objects.get(text='Новый пост')
+        self.assertIsNotNone(self.ready_thumbnail(post))
+
+    def test_thumbnails_single_flight(self):
+        """Проверка, что занятая блокировка не даёт делать работу дважды."""
+        post = self.create_post()
+        cache.add(LOCK_KEY.format(name=post.image.name), True)
+        generate_thumbnails(post.image.name)
+        self.assertIsNone(self.ready_thumbnail(post))
+
+    def test_thumbnails_responsive_variants(self):
+        """Проверка srcset, WebP-варианта и ленивой загрузки в ленте."""
+        post = self.create_post()
+        generate_thumbnails(post.image.name)
+        cache.clear()
+        response = self.client.get(reverse('posts:index'))
+        content = response.content.decode()
+        self.assertIn('type="image/webp"', content)
+        self.assertIn('loading="lazy"', content)
+        self.assertIn('width="960" height="339"', content)
+        for width in settings.POST_IMAGE_WIDTHS:
+            with self.subTest(width=width):
+                self.assertIn(f'.webp {width}w', content)
+                self.assertIn(f'.jpg {width}w', content)
+
+    def test_thumbnails_prefetched_in_one_batch(self):
+        """Проверка, что миниатюры страницы читаются одним запросом к БД."""
+        posts = [self.create_post(f'small{index}.gif') for index in range(3)]
+        for post in posts[:2]:
+            generate_thumbnails(post.image.name)
+        cache.clear()
+        with self.assertNumQueries(1):
+            prefetch_thumbnails(posts)
+        variants = len(settings.POST_IMAGE_WIDTHS) * (
+            1 + len(settings.POST_IMAGE_FORMATS)
+        )
+        for post in posts:
+            with self.subTest(post=post.pk):
+                self.assertEqual(len(post.ready_thumbnails), variants)
+        self.assertNotIn(
+            None, [thumbnail for _, _, thumbnail in posts[0].ready_thumbnails]
+        )
+        self.assertEqual(
+            {thumbnail for _, _, thumbnail in posts[2].ready_thumbnails},
+            {None},
+        )
+        with self.assertNumQueries(0):
+            prefetch_thumbnails(posts)
+
+    def test_thumbnails_prefetched_data_used_by_template(self):
+        """Проверка, что тег картинки не ходит в хранилище при prefetch."""
+        post = self.create_post()
+        generate_thumbnails(post.image.name)
+        prefetch_thumbnails([post])
+        with mock.patch.object(
+            default.backend, 'get_ready_thumbnails'
+        ) as get_ready:
+            context = responsive_image(post.image, post.ready_thumbnails)
+        get_ready.assert_not_called()
+        self.assertIsNotNone(context['fallback'])
+        self.assertIn('.webp', context['sources'][0]['srcset'])
+
+    def test_thumbnails_names_match_sorl(self):
+        """Проверка, что имя миниатюры совпадает с именем от sorl."""
+        post = self.create_post()
+        variants = [
+            (geometry, options)
+            for _, _, geometry, options in responsive_variants()
+        ] + list(settings.POST_THUMBNAILS)
+        for geometry, options in variants:
+            with self.subTest(geometry=geometry, options=options):
+                self.assertEqual(
+                    default.backend.thumbnail_file(
+                        post.image, geometry, **options
+                    ).name,
+                    default.backend.get_thumbnail(
+                        post.image, geometry, **options
+                    ).name,
+                )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, THUMBNAIL_WORKERS=1)
+class ThumbnailPoolTests(TransactionTestCase):
+    """Фоновый пул: нужны зафиксированные данные, видимые его потокам."""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_thumbnails_generated_in_pool(self):
+        """Проверка, что миниатюры создаются потоком фонового пула."""
+        post = Post.objects.create(
+            text='Пост с картинкой',
+            author=User.objects.create_user(username='author'),
+            image=SimpleUploadedFile(
+                name='pool.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+        threads = []
+
+        def generate(name):
+            threads.append(threading.current_thread().name)
+            generate_thumbnails(name)
+
+        with mock.patch(
+            'posts.thumbnails.generate_thumbnails', side_effect=generate
+        ):
+            enqueue_thumbnails(post.image.name).result(timeout=30)
+        self.assertTrue(threads[0].startswith('thumbnails'))
+        geometry, options = settings.POST_THUMBNAILS[0]
+        self.assertIsNotNone(default.backend.get_ready_thumbnail(
+            post.image, geometry, **options
+        ))
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.old_post = Post.objects.create(
+            text='Старый пост', author=cls.author
+        )
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def follow(self):
+        self.reader_client.get(
+            reverse('posts:profile_follow', kwargs={'username': 'author'})
+        )
+
+    def timeline_posts(self):
+        return list(
+            TimelineEntry.objects.filter(user=self.reader)
+            .values_list('post_id', flat=True)
+        )
+
+    def test_timeline_backfill_on_follow(self):
+        """Проверка, что подписка добавляет в ленту старые посты автора."""
+        self.follow()
+        self.assertEqual(self.timeline_posts(), [self.old_post.pk])
+
+    def test_timeline_fan_out_on_create(self):
+        """Проверка, что новый пост попадает в ленты подписчиков."""
+        self.follow()
+        new_post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(
+            self.timeline_posts(), [new_post.pk, self.old_post.pk]
+        )
+
+    def test_timeline_prune_on_unfollow(self):
+        """Проверка, что отписка очищает ленту от постов автора."""
+        self.follow()
+        self.reader_client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': 'author'})
+        )
+        self.assertEqual(self.timeline_posts(), [])
+
+    def test_timeline_follow_index_reads_materialized_feed(self):
+        """Проверка, что лента подписок не соединяется с Follow."""
+        self.follow()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.old_post])
+        self.assertFalse(any(
+            'posts_follow' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+    @override_settings(FOLLOW_FEED_MATERIALIZED=False)
+    def test_timeline_fallback_to_join(self):
+        """Проверка запасного режима ленты через соединение с Follow."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        TimelineEntry.objects.all().delete()
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.old_post])
+
+    def test_timeline_benchmark_command(self):
+        """Проверка, что бенчмарк сравнивает оба способа чтения ленты."""
+        self.follow()
+        out = StringIO()
+        call_command('benchmark_follow_feed', repeat=1, stdout=out)
+        self.assertIn('join', out.getvalue())
+        self.assertIn('timeline', out.getvalue())
@@ -1,6 +1,11 @@
+import base64
+import json
+
 from django import forms
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from posts.models import Comment, Follow, Group, Post
 
@@ -281,7 +286,7 @@ class PostsViewsTests(TestCase):
             reverse('posts:follow_index')
         )
         post_unfollow = response_unfollower.context.get('page_obj')
-        self.assertEqual(post_unfollow.object_list.count(), 0)
+        self.assertEqual(len(post_unfollow.object_list), 0)
 
 
 class PostsPaginatorViewsTests(TestCase):
@@ -308,3 +313,104 @@ class PostsPaginatorViewsTests(TestCase):
             reverse('posts:index') + '?page=2'
         )
         self.assertEqual(len(response.context.get('page_obj').object_list), 3)
+
+    def test_posts_next_page_by_cursor(self):
+        """Проверка перехода на следующую страницу по курсору."""
+        first_page = self.authorized_client1.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        response = self.authorized_client1.get(
+            reverse('posts:index') + f'?after={first_page.next_cursor}'
+        )
+        page_obj = response.context.get('page_obj')
+        self.assertEqual(len(page_obj.object_list), 3)
+        self.assertIsNone(page_obj.next_cursor)
+        self.assertFalse(set(page_obj) & set(first_page))
+
+    def test_posts_previous_page_by_cursor(self):
+        """Проверка возврата на предыдущую страницу по курсору."""
+        first_page = self.authorized_client1.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        second_page = self.authorized_client1.get(
+            reverse('posts:index') + f'?after={first_page.next_cursor}'
+        ).context['page_obj']
+        response = self.authorized_client1.get(
+            reverse('posts:index') + f'?before={second_page.previous_cursor}'
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(first_page)
+        )
+
+    @override_settings(PAGINATOR_OFFSET_PAGES=1)
+    def test_posts_deep_page_number_uses_cursor(self):
+        """Проверка, что глубокий ?page=N отдаётся без OFFSET по строкам."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.authorized_client1.get(
+                reverse('posts:index') + '?page=2'
+            )
+        self.assertEqual(len(response.context['page_obj'].object_list), 3)
+        post_queries = [
+            query['sql'] for query in queries.captured_queries
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        self.assertTrue(
+            any('"posts_post"."pub_date" <' in sql for sql in post_queries)
+        )
+
+    def test_posts_paginator_does_not_count(self):
+        """Проверка, что ленты не выполняют COUNT(*) по постам."""
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client1.get(reverse('posts:index') + '?page=2')
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+
+    def test_posts_broken_cursor_returns_first_page(self):
+        """Проверка, что испорченный курсор не ломает страницу."""
+        response = self.authorized_client1.get(
+            reverse('posts:index') + '?after=broken'
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_posts_malformed_cursor_returns_first_page(self):
+        """Проверка, что курсор с чужими типами значений не даёт 500."""
+        for values in ([None, None], [1.5, 2], [[1], [2]]):
+            cursor = base64.urlsafe_b64encode(
+                json.dumps(values).encode()
+            ).decode()
+            for name in ('after', 'before'):
+                with self.subTest(values=values, name=name):
+                    response = self.authorized_client1.get(
+                        reverse('posts:index') + f'?{name}={cursor}'
+                    )
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_posts_last_page_has_remainder(self):
+        """Проверка, что последняя страница не повторяет предыдущую."""
+        first_page = self.authorized_client1.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        page_obj = self.authorized_client1.get(
+            reverse('posts:index') + '?page=last'
+        ).context['page_obj']
+        self.assertEqual(page_obj.number, 2)
+        self.assertEqual(len(page_obj.object_list), 3)
+        self.assertFalse(set(page_obj) & set(first_page))
+        self.assertTrue(page_obj.has_previous())
+        self.assertFalse(page_obj.has_next())
+
+    def test_posts_cursor_page_navigation_methods(self):
+        """Проверка has_next/has_previous у страницы, открытой курсором."""
+        first_page = self.authorized_client1.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        self.assertTrue(first_page.has_next())
+        self.assertFalse(first_page.has_previous())
+        page_obj = self.authorized_client1.get(
+            reverse('posts:index') + f'?after={first_page.next_cursor}'
+        ).context['page_obj']
+        self.assertFalse(page_obj.has_next())
+        self.assertTrue(page_obj.has_previous())
+        self.assertTrue(page_obj.has_other_pages())
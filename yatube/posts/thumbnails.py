@@ -0,0 +1,212 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from core import object_cache
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from posts.feed_cache import bump_feed_generation
+from posts.models import Post
+from posts.signals import post_feed_scopes
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile, deserialize_image_file
+from sorl.thumbnail.kvstores import cached_db_kvstore
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'thumbnail_lock:{name}'
+
+_executor = None
+
+
+class PostThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl-thumbnail, умеющий искать миниатюру без её создания."""
+
+    def thumbnail_file(self, file_, geometry_string, **options):
+        """
+        Файл миниатюры без обращения к хранилищам.
+
+        Повторяет подготовку опций из ``ThumbnailBackend.get_thumbnail``
+        sorl-thumbnail 12.7 (версия закреплена в requirements.txt);
+        совпадение имён проверяет ``test_thumbnails``.
+        """
+        source = ImageFile(file_)
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return ImageFile(name, default.storage)
+
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Возвращает миниатюру из KV-хранилища или ``None``."""
+        if not file_:
+            return None
+        ready, = self.get_ready_thumbnails([(file_, geometry_string, options)])
+        return ready
+
+    def get_ready_thumbnails(self, requests):
+        """
+        Готовые миниатюры для списка ``(файл, геометрия, опции)``.
+
+        Для ``cached_db_kvstore`` ключи читаются одним ``get_many`` из кеша,
+        а промахи — одним запросом к таблице KV-хранилища; отсутствие
+        записи кешируется так же, как это делает сам sorl-thumbnail.
+        """
+        thumbnails = [
+            self.thumbnail_file(file_, geometry, **options)
+            for file_, geometry, options in requests
+        ]
+        kvstore = default.kvstore
+        empty = cached_db_kvstore.EMPTY_VALUE
+        if not isinstance(kvstore, cached_db_kvstore.KVStore):
+            return [kvstore.get(thumbnail) for thumbnail in thumbnails]
+        keys = [add_prefix(thumbnail.key) for thumbnail in thumbnails]
+        values = kvstore.cache.get_many(keys)
+        missing = set(keys) - set(values)
+        if missing:
+            stored = dict(
+                KVStoreModel.objects.filter(key__in=missing)
+                .values_list('key', 'value')
+            )
+            fetched = {key: stored.get(key, empty) for key in missing}
+            kvstore.cache.set_many(
+                fetched, sorl_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+            values.update(fetched)
+        return [
+            None if values[key] == empty
+            else deserialize_image_file(values[key])
+            for key in keys
+        ]
+
+
+def responsive_variants():
+    """
+    Варианты картинки поста для ``srcset``.
+
+    Для каждой ширины отдаёт основной формат sorl-thumbnail и
+    дополнительные форматы из ``POST_IMAGE_FORMATS`` (например, WebP).
+    Кортежи имеют вид ``(ширина, формат, геометрия, опции)``.
+    """
+    ratio_width, ratio_height = settings.POST_IMAGE_RATIO
+    for width in settings.POST_IMAGE_WIDTHS:
+        geometry = f'{width}x{round(width * ratio_height / ratio_width)}'
+        for image_format in (None, *settings.POST_IMAGE_FORMATS):
+            options = dict(settings.POST_IMAGE_OPTIONS)
+            if image_format:
+                options['format'] = image_format
+            yield width, image_format, geometry, options
+
+
+def ready_variants(files):
+    """
+    Готовые варианты ``responsive_variants`` для каждого файла.
+
+    Все файлы разрешаются одним пакетным чтением KV-хранилища; для
+    каждого файла возвращается список ``(ширина, формат, миниатюра)``,
+    для пустого — пустой список.
+    """
+    variants = list(responsive_variants())
+    requests = [
+        (file_, geometry, options)
+        for file_ in files if file_
+        for _, _, geometry, options in variants
+    ]
+    thumbnails = iter(
+        default.backend.get_ready_thumbnails(requests) if requests else ()
+    )
+    return [
+        [
+            (width, image_format, next(thumbnails))
+            for width, image_format, _, _ in variants
+        ] if file_ else []
+        for file_ in files
+    ]
+
+
+def prefetch_thumbnails(posts):
+    """Сохраняет готовые варианты картинок в ``post.ready_thumbnails``."""
+    posts = list(posts)
+    for post, ready in zip(
+        posts, ready_variants([post.image for post in posts])
+    ):
+        post.ready_thumbnails = ready
+    return posts
+
+
+def thumbnail_variants():
+    seen = set()
+    variants = [
+        *settings.POST_THUMBNAILS,
+        *((geometry, options)
+          for _, _, geometry, options in responsive_variants()),
+    ]
+    for geometry, options in variants:
+        key = (geometry, tuple(sorted(options.items())))
+        if key not in seen:
+            seen.add(key)
+            yield geometry, options
+
+
+def generate_thumbnails(name):
+    """Создаёт все известные размеры миниатюр для картинки ``name``."""
+    lock_key = LOCK_KEY.format(name=name)
+    if not cache.add(lock_key, True, settings.THUMBNAIL_LOCK_TIMEOUT):
+        return
+    try:
+        for geometry, options in thumbnail_variants():
+            default.backend.get_thumbnail(name, geometry, **options)
+        # Разметка постов с картинкой изменилась: сбрасываем их ETag
+        # и закешированные страницы.
+        posts = Post.objects.filter(image=name)
+        posts.update(updated=timezone.now())
+        for post in posts.only('pk', 'author', 'group'):
+            object_cache.invalidate(post)
+            bump_feed_generation(*post_feed_scopes(post, post.group_id))
+    except Exception:
+        logger.exception('Не удалось создать миниатюры для %s', name)
+    finally:
+        cache.delete(lock_key)
+
+
+def _generate_in_worker(name):
+    try:
+        generate_thumbnails(name)
+    finally:
+        connection.close()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+def enqueue_thumbnails(name):
+    """Отдаёт картинку фоновому пулу; возвращает ``Future`` или ``None``."""
+    if settings.THUMBNAIL_WORKERS:
+        return get_executor().submit(_generate_in_worker, name)
+    generate_thumbnails(name)
+    return None
+
+
+def schedule_thumbnails(post):
+    """Ставит картинку поста в очередь после фиксации транзакции."""
+    if post.image:
+        name = post.image.name
+        transaction.on_commit(lambda: enqueue_thumbnails(name))
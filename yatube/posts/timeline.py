@@ -0,0 +1,102 @@
+from collections import defaultdict
+
+from django.conf import settings
+from posts.models import Follow, Post, TimelineEntry
+
+
+def _insert(entries):
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def fan_out(post):
+    """Раскладывает новый пост по лентам всех подписчиков автора."""
+    follower_ids = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    batch = []
+    for user_id in follower_ids.iterator():
+        batch.append(TimelineEntry(
+            user_id=user_id,
+            post_id=post.pk,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        ))
+        if len(batch) >= settings.TIMELINE_BATCH_SIZE:
+            _insert(batch)
+            batch = []
+    _insert(batch)
+
+
+def fan_out_since(author_ids, since_pk=0, exclude_user_ids=()):
+    """
+    Раскладывает посты авторов ``author_ids`` с ``pk`` больше ``since_pk``
+    по лентам их подписчиков, кроме ``exclude_user_ids``.
+
+    Уже разложенные посты пропускаются (``ignore_conflicts``), остальные
+    записи лент подписчиков не трогаются.
+    """
+    excluded = set(exclude_user_ids)
+    followers = defaultdict(list)
+    follows = Follow.objects.filter(author_id__in=author_ids).values_list(
+        'author_id', 'user_id'
+    )
+    for author_id, user_id in follows.iterator():
+        if user_id not in excluded:
+            followers[author_id].append(user_id)
+    posts = Post.objects.filter(
+        author_id__in=list(followers), pk__gt=since_pk
+    ).order_by().values_list('pk', 'author_id', 'pub_date')
+    batch = []
+    for post_id, author_id, pub_date in posts.iterator():
+        for user_id in followers[author_id]:
+            batch.append(TimelineEntry(
+                user_id=user_id,
+                post_id=post_id,
+                author_id=author_id,
+                pub_date=pub_date,
+            ))
+        if len(batch) >= settings.TIMELINE_BATCH_SIZE:
+            _insert(batch)
+            batch = []
+    _insert(batch)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика уже опубликованные посты автора."""
+    posts = Post.objects.filter(author_id=author_id).values_list(
+        'pk', 'pub_date'
+    )
+    batch = []
+    for post_id, pub_date in posts.iterator():
+        batch.append(TimelineEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        ))
+        if len(batch) >= settings.TIMELINE_BATCH_SIZE:
+            _insert(batch)
+            batch = []
+    _insert(batch)
+
+
+def prune(user_id, author_id):
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild(user_ids=None):
+    """Пересобирает ленты подписчиков (всех или перечисленных)."""
+    entries = TimelineEntry.objects.all()
+    follows = Follow.objects.order_by('pk')
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+        follows = follows.filter(user_id__in=user_ids)
+    entries.delete()
+    for user_id, author_id in follows.values_list(
+        'user_id', 'author_id'
+    ).iterator():
+        backfill(user_id, author_id)
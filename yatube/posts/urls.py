@@ -1,5 +1,5 @@
 from django.urls import path
-from posts import views
+from posts import feeds, views
 
 app_name = 'posts'
 
@@ -7,6 +7,9 @@ urlpatterns = [
     path('', views.index, name='index',),
     path('follow/', views.follow_index, name='follow_index',),
     path('create/', views.post_create, name='post_create',),
+    path('search/', views.search, name='search',),
+    path('feed/rss/', feeds.index_rss, name='index_rss'),
+    path('feed/atom/', feeds.index_atom, name='index_atom'),
     path('profile/<str:username>/', views.profile, name='profile',),
     path(
         'profile/<str:username>/follow/',
@@ -18,9 +21,26 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow',
     ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.profile_rss,
+        name='profile_rss',
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.profile_atom,
+        name='profile_atom',
+    ),
     path('group/<slug:slug>/', views.group_list, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.group_rss, name='group_rss'),
+    path('group/<slug:slug>/atom/', feeds.group_atom, name='group_atom'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail',),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit',),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments',
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.post_comment,
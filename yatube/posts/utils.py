@@ -0,0 +1,32 @@
+from django.conf import settings
+from core.paginator import CursorPaginator
+
+
+def paginate(request, queryset, ordering=('-pub_date', '-pk')):
+    paginator = CursorPaginator(
+        queryset,
+        settings.POSTS_PER_PAGE,
+        ordering=ordering,
+        offset_pages=settings.PAGINATOR_OFFSET_PAGES,
+    )
+    page_obj = paginator.get_page(
+        request.GET.get('page'),
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    return paginator, page_obj
+
+
+def paginate_comments(comments, per_page, after=None):
+    """
+    Страница комментариев от новых к старым по курсору ``(created, id)``.
+
+    Сортировка совпадает с индексом ``comment_post_created_idx``, так что
+    следующая порция читается поиском по индексу без OFFSET.
+    """
+    paginator = CursorPaginator(
+        comments.select_related('author'),
+        per_page,
+        ordering=('-created', '-pk'),
+    )
+    return paginator.get_page(after=after)
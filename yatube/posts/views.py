@@ -1,44 +1,81 @@
+from core.object_cache import get_object, load_related
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.http import urlencode
+from posts.conditional import (conditional, group_validators,
+                               index_validators, post_validators,
+                               profile_validators, shared)
+from posts.feed_cache import (author_scope, feed_cache_context, group_scope,
+                              index_scope, post_scope, stats_scope,
+                              user_scope)
 from posts.forms import CommentForm, PostForm
-from posts.models import Follow, Group, Post
+from posts.models import Follow, Group, Post, TimelineEntry, UserStats
+from posts.page_cache import cache_anonymous_page, tag_page
+from posts.search import search_post_ids
+from posts.thumbnails import schedule_thumbnails
+from posts.utils import paginate, paginate_comments
 
 User = get_user_model()
 
 
+def _shared_or_404(request, name, model, **lookup):
+    """Объект, найденный валидатором условного GET, или поиск через кеш."""
+    obj = shared(request, name, lambda: get_object(model, **lookup))
+    if obj is None:
+        raise Http404(f'{model._meta.object_name} не найден.')
+    return obj
+
+
+@cache_anonymous_page
+@conditional(index_validators)
 def index(request):
-    posts = Post.objects.all()
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    tag_page(request, index_scope())
+    posts = Post.objects.select_related('author', 'group')
+    paginator, page_obj = paginate(request, posts)
+    tag_page(request, *(user_scope(post.author_id) for post in page_obj))
     context = {
         'page_obj': page_obj,
         'paginator': paginator,
+        **feed_cache_context(page_obj, index_scope()),
     }
     return render(request, 'posts/index.html', context)
 
 
+@cache_anonymous_page
+@conditional(profile_validators)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = author.posts.all()
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    followers = Follow.objects.filter(author__username=username).count()
+    author = _shared_or_404(request, 'author', User, username=username)
+    tag_page(
+        request,
+        author_scope(author.pk),
+        user_scope(author.pk),
+        stats_scope(author.pk),
+    )
+    posts = author.posts.select_related('group')
+    paginator, page_obj = paginate(request, posts)
+    tag_page(request, *(
+        group_scope(post.group_id) for post in page_obj if post.group_id
+    ))
+    stats = shared(
+        request, 'stats', lambda: UserStats.objects.for_user(author)
+    )
     context = {
         'author': author,
         'page_obj': page_obj,
-        'followers': followers,
+        'stats': stats,
+        'followers': stats.follower_count,
         'following': False,
+        **feed_cache_context(page_obj, author_scope(author.pk)),
     }
     if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            author=author, user=request.user
-        ).exists()
+        following = shared(request, 'following', lambda: (
+            Follow.objects.filter(author=author, user=request.user).exists()
+        ))
         context.update({
             'following': following,
             'user': request.user,
@@ -46,33 +83,106 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+@cache_anonymous_page
+@conditional(post_validators)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = load_related(
+        _shared_or_404(request, 'post', Post, pk=post_id),
+        ('author', 'group'),
+    )
+    tag_page(
+        request,
+        post_scope(post.pk),
+        author_scope(post.author_id),
+        user_scope(post.author_id),
+    )
+    if post.group_id:
+        tag_page(request, group_scope(post.group_id))
     form = CommentForm(request.POST)
-    comments = post.comments.all()
+    comments = paginate_comments(
+        post.comments, settings.COMMENTS_FIRST_PAGE
+    )
+    tag_page(request, *(user_scope(comment.author_id) for comment in comments))
     context = {
         'post': post,
+        'author_stats': UserStats.objects.for_user(post.author),
         'form': form,
         'comments': comments,
+        'comments_next_url': _comments_next_url(post.pk, comments),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@conditional(post_validators)
+def post_comments(request, post_id):
+    post = _shared_or_404(request, 'post', Post, pk=post_id)
+    comments = paginate_comments(
+        post.comments,
+        settings.COMMENTS_PAGE_SIZE,
+        after=request.GET.get('after'),
+    )
+    context = {
+        'comments': comments,
+        'comments_next_url': _comments_next_url(post_id, comments),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+def _comments_next_url(post_id, comments):
+    """Адрес фрагмента со следующей порцией комментариев."""
+    if not comments.next_cursor:
+        return None
+    url = reverse('posts:post_comments', kwargs={'post_id': post_id})
+    return f'{url}?{urlencode({"after": comments.next_cursor})}'
+
+
+@cache_anonymous_page
+@conditional(group_validators)
 def group_list(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    group = _shared_or_404(request, 'group', Group, slug=slug)
+    tag_page(request, group_scope(group.pk))
+    posts = group.posts.select_related('author')
+    paginator, page_obj = paginate(request, posts)
+    tag_page(request, *(user_scope(post.author_id) for post in page_obj))
     context = {
         'group': group,
         'paginator': paginator,
         'page_obj': page_obj,
+        **feed_cache_context(page_obj, group_scope(group.pk)),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    try:
+        number = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        number = 1
+    number = min(number, settings.SEARCH_MAX_PAGES)
+    per_page = settings.POSTS_PER_PAGE
+    post_ids = search_post_ids(
+        query, limit=per_page + 1, offset=(number - 1) * per_page
+    )
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        post_ids[:per_page]
+    )
+    context = {
+        'query': query,
+        'posts': [posts[pk] for pk in post_ids[:per_page] if pk in posts],
+        'number': number,
+        'previous_number': number - 1,
+        'next_number': (
+            number + 1
+            if len(post_ids) > per_page and number < settings.SEARCH_MAX_PAGES
+            else None
+        ),
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(data=request.POST, files=request.FILES)
 
@@ -86,13 +196,14 @@ def post_create(request):
     post = form.save(commit=False)
     post.author = request.user
     post.save()
+    schedule_thumbnails(post)
     return redirect('posts:profile', post.author)
 
 
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
-    if post.author != request.user:
+    if post.author_id != request.user.pk:
         return redirect('posts:post_detail', post_id=post_id)
 
     form = PostForm(
@@ -101,7 +212,9 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        post = form.save()
+        if 'image' in form.changed_data:
+            schedule_thumbnails(post)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
@@ -125,10 +238,19 @@ def post_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(posts, settings.POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    if settings.FOLLOW_FEED_MATERIALIZED:
+        entries = TimelineEntry.objects.filter(
+            user=request.user
+        ).select_related('post__author', 'post__group')
+        paginator, page_obj = paginate(
+            request, entries, ordering=('-pub_date', '-post_id')
+        )
+        page_obj.object_list = [entry.post for entry in page_obj]
+    else:
+        posts = Post.objects.filter(
+            author__following__user=request.user
+        ).select_related('author', 'group')
+        paginator, page_obj = paginate(request, posts)
     context = {
         'page_obj': page_obj,
         'paginator': paginator,
@@ -137,6 +259,7 @@ def follow_index(request):
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
     user = request.user
     author = get_object_or_404(User, username=username)
@@ -149,6 +272,7 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     unfollow = Follow.objects.select_related('user').filter(
         user=request.user,
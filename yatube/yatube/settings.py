@@ -43,25 +43,53 @@ INSTALLED_APPS = [
     'posts.apps.PostsConfig',
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+#   доля запросов, для которых считаются SQL и время рендера
+#   (заголовок Server-Timing и лог yatube.profiling); по умолчанию
+#   выключено, включается переменной YATUBE_PROFILING_SAMPLE_RATE
+PROFILING_SAMPLE_RATE = float(
+    os.environ.get('YATUBE_PROFILING_SAMPLE_RATE', 0)
+)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        #   DjangoTemplates, считающий время рендера для профилирования
+        'BACKEND': 'core.template_backends.ProfiledDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -86,7 +114,43 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+    }
+}
+
+#   реплики только для чтения (core.routers); локально роль реплики
+#   играет копия базы, которую обновляет manage.py sync_replica
+DATABASE_REPLICAS = []
+if os.environ.get('YATUBE_SQLITE_REPLICA'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
     }
+    DATABASE_REPLICAS.append('replica')
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+#   представления, которые могут читать с реплики, допустимое отставание
+#   реплики и время закрепления сессии за основной базой после записи
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'posts:post_comments',
+    'posts:follow_index',
+)
+REPLICA_MAX_LAG = 5
+REPLICA_PIN_SECONDS = 10
+
+#   прагмы для каждого соединения с SQLite (core.db): WAL не даёт
+#   писателям блокировать читателей, busy_timeout ждёт блокировку
+#   вместо ошибки «database is locked», размеры кешей в КиБ и байтах
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
 }
 
 
@@ -138,6 +202,22 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 POSTS_PER_PAGE = 10
+#   страницы глубже этой отдаются по курсору, а не через OFFSET
+PAGINATOR_OFFSET_PAGES = 5
+#   размер страницы JSON API по умолчанию и предел для ?limit=
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+#   комментарии: сколько показать сразу и сколько догружать за раз
+COMMENTS_FIRST_PAGE = 20
+COMMENTS_PAGE_SIZE = 50
+
+#   лента подписок читается из материализованной таблицы TimelineEntry;
+#   False возвращает прежний запрос через соединение с Follow
+FOLLOW_FEED_MATERIALIZED = True
+
+#   поиск по индексу FTS5 ранжирует совпадения, глубокие страницы не нужны
+SEARCH_MAX_PAGES = 50
+TIMELINE_BATCH_SIZE = 500
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
@@ -146,8 +226,79 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 #   для подключения бэкенда кеширования
+#   каталог общего кеша и файла рассылки сбросов между процессами;
+#   общий ярус распаковывает найденные там pickle, поэтому каталог
+#   не должен быть доступен на запись другим пользователям (не /tmp)
+CACHE_DIR = os.environ.get('YATUBE_CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
 CACHES = {
+    #   LRU в памяти процесса перед общим кешем
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED': 'shared',
+            'LOCAL_MAX_ENTRIES': 1000,
+            'LOCAL_TIMEOUT': 5,
+            #   счётчики и блокировки читаются только из общего кеша
+            'LOCAL_EXCLUDE': ('object_cache:stats:', 'thumbnail_lock:'),
+            'BROADCAST_PATH': (
+                None if DEBUG
+                else os.path.join(CACHE_DIR, 'invalidations.log')
+            ),
+        },
+    },
+    #   общий для всех процессов ярус; при отладке процесс один и
+    #   хватает памяти. Блокировки core.stampede и миниатюр и счётчики
+    #   кеша объектов требуют атомарных add() и incr(), поэтому в
+    #   продакшене здесь должен быть memcached или redis: FileBasedCache
+    #   их не гарантирует, и с ним несколько процессов могут пересчитать
+    #   одну запись одновременно, а счётчики — терять приращения
+    'shared': {
+        'BACKEND': (
+            'django.core.cache.backends.locmem.LocMemCache' if DEBUG
+            else 'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.path.join(CACHE_DIR, 'shared'),
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
 }
+#   время жизни фрагментов лент; запись поста сбрасывает их сразу
+FEED_CACHE_TIMEOUT = 20
+#   разметка отдельного поста в лентах; ключ меняется вместе с постом
+POST_ITEM_CACHE_TIMEOUT = 60 * 60 * 24
+#   кеш постов, групп и пользователей по ключу сбрасывается сигналами,
+#   отсутствие объекта (404) кешируется ненадолго
+OBJECT_CACHE_TIMEOUT = 60 * 60
+OBJECT_CACHE_MISSING_TIMEOUT = 30
+#   счётчики попаданий копятся в процессе и пишутся в общий кеш
+#   раз в столько поисков
+OBJECT_CACHE_STATS_FLUSH = 100
+#   защита от одновременного пересчёта записей кеша (core.stampede):
+#   сколько отдавать прежнее значение, пока другой процесс его
+#   пересчитывает, сколько держать блокировку и ждать нового значения
+CACHE_STAMPEDE_GRACE = 60
+CACHE_STAMPEDE_LOCK_TIMEOUT = 10
+CACHE_STAMPEDE_WAIT = 2
+#   больше — раньше вероятностный пересчёт до истечения (XFetch)
+CACHE_STAMPEDE_BETA = 1.0
+#   готовые страницы для анонимов; устаревают по тегам, а не по времени
+PAGE_CACHE_TIMEOUT = 60 * 10
+#   RSS/Atom: число постов в ленте и время жизни готового XML в кеше
+#   (ключ меняется вместе с лентой, поэтому время может быть большим)
+SYNDICATION_ITEMS = 20
+SYNDICATION_CACHE_TIMEOUT = 60 * 60
+
+#   миниатюры картинок постов создаются фоновым пулом после загрузки
+THUMBNAIL_BACKEND = 'posts.thumbnails.PostThumbnailBackend'
+POST_THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+#   адаптивные варианты картинок ленты: ширины, пропорции и форматы,
+#   которые создаются вместе с основным форматом sorl-thumbnail
+POST_IMAGE_WIDTHS = (320, 640, 960)
+POST_IMAGE_RATIO = (960, 339)
+POST_IMAGE_FORMATS = ('WEBP',)
+POST_IMAGE_OPTIONS = {'crop': 'center', 'upscale': True}
+POST_IMAGE_SIZES = '(max-width: 992px) 100vw, 960px'
+#   фоновые потоки для миниатюр; 0 — создавать миниатюры сразу
+THUMBNAIL_WORKERS = 2
+THUMBNAIL_LOCK_TIMEOUT = 60